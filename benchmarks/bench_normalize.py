@@ -0,0 +1,301 @@
+"""Country normalization benchmarks.
+
+Measures the country index cold and warm start, refreshing, exact hit and fuzzy search
+latency percentiles, batch throughput and peak memory (traced python allocations).
+
+Usage::
+
+    % python benchmarks/bench_normalize.py
+    % python benchmarks/bench_normalize.py --engine ngram --json bench.json
+    % python benchmarks/bench_normalize.py --compare bench.json --tolerance 0.3
+
+The ``--compare`` option exits with a non zero code if some time or memory metric
+is greater than the same metric from the saved results by more than ``--tolerance``.
+"""
+
+# pylint: disable=import-outside-toplevel
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dicountries.loader import get_raw_data  # noqa: E402 # isort:skip
+from dicountries.whoosh_index import CountryIndex  # noqa: E402 # isort:skip
+
+#: Latency percentiles to report.
+PERCENTILES = (50, 90, 99)
+
+#: Symbols used to generate typos.
+TYPO_ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def load_names(file_name: str) -> List[str]:
+    """Load country names from the package data.
+
+    Args:
+        file_name: data file name
+
+    Returns:
+        non empty names
+
+    """
+    lines = get_raw_data(file_name).decode('utf-8').splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def make_typo(name: str, rng: random.Random) -> str:
+    """Make a random typo in the name (deletion, insertion, substitution or transposition).
+
+    Args:
+        name: name to change
+        rng: random generator
+
+    Returns:
+        name with a typo
+
+    """
+    if len(name) < 5:
+        return name + rng.choice(TYPO_ALPHABET)
+    i = rng.randrange(1, len(name) - 2)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return name[:i] + name[i + 1 :]
+    if kind == 1:
+        return name[:i] + rng.choice(TYPO_ALPHABET) + name[i:]
+    if kind == 2:
+        return name[:i] + rng.choice(TYPO_ALPHABET) + name[i + 1 :]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """Calculate latency percentiles.
+
+    Args:
+        samples: latencies in seconds
+
+    Returns:
+        percentiles (in microseconds) by names like **p50**
+
+    """
+    ordered = sorted(samples)
+    result = {}
+    for percentile in PERCENTILES:
+        index = min(len(ordered) - 1, round(percentile / 100 * (len(ordered) - 1)))
+        result[f'p{percentile}_us'] = ordered[index] * 1e6
+    result['mean_us'] = sum(ordered) / len(ordered) * 1e6
+    return result
+
+
+def timed(func: Callable[[], Any]) -> Tuple[float, Any]:
+    """Run a function measuring its wall clock time.
+
+    Args:
+        func: function to run
+
+    Returns:
+        the time in seconds and the function result
+
+    """
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def traced(func: Callable[[], Any]) -> Tuple[int, Any]:
+    """Run a function measuring peak memory of the python allocations.
+
+    Args:
+        func: function to run
+
+    Returns:
+        the peak memory in bytes and the function result
+
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+def latencies(country_index: CountryIndex, names: List[str]) -> List[float]:
+    """Measure latency of every :py:meth:`CountryIndex.normalize_country` call.
+
+    Args:
+        country_index: country index
+        names: names to normalize
+
+    Returns:
+        latencies in seconds
+
+    """
+    samples = []
+    for name in names:
+        start = time.perf_counter()
+        country_index.normalize_country(name)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run all benchmarks.
+
+    Args:
+        args: parsed command line arguments
+
+    Returns:
+        benchmark results
+
+    """
+    rng = random.Random(args.seed)
+    names = load_names('country_list.txt') + load_names('user_country_list.txt')
+    typo_names = list(dict.fromkeys(make_typo(rng.choice(names), rng) for _ in range(args.typos)))
+    results: Dict[str, Any] = dict(engine=args.engine)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index_path = os.path.join(tmp_dir, 'countries')
+        kwargs = dict(index_path=index_path, engine=args.engine)
+
+        results['cold_start_s'], country_index = timed(
+            lambda: CountryIndex(use_snapshot=False, **kwargs)
+        )
+        CountryIndex(**kwargs)  # save the super index snapshot
+        results['warm_start_s'], _ = timed(lambda: CountryIndex(**kwargs))
+        results['refresh_s'], _ = timed(country_index.refresh)
+
+        simple_index = country_index.simple_index or {}
+        exact_names = [name for name in names if name in simple_index]
+        results['exact'] = percentiles(latencies(country_index, exact_names * args.repeat))
+
+        country_index.search_cache.clear()
+        results['fuzzy'] = percentiles(latencies(country_index, typo_names))
+        results['fuzzy_cached'] = percentiles(latencies(country_index, typo_names))
+
+        batch = (names + typo_names) * args.repeat
+        country_index.search_cache.clear()
+        batch_time, _ = timed(lambda: country_index.normalize_countries(batch))
+        results['batch_names_per_s'] = len(batch) / batch_time
+
+        if not args.no_memory:
+            memory_path = os.path.join(tmp_dir, 'memory')
+            results['cold_start_peak_bytes'], _ = traced(
+                lambda: CountryIndex(index_path=memory_path, use_snapshot=False, engine=args.engine)
+            )
+            country_index.search_cache.clear()
+            results['fuzzy_peak_bytes'], _ = traced(
+                lambda: [country_index.normalize_country(name) for name in typo_names]
+            )
+    return results
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print benchmark results.
+
+    Args:
+        results: benchmark results
+
+    """
+    for key, value in results.items():
+        if isinstance(value, dict):
+            details = ', '.join(f'{k}={v:.1f}' for k, v in value.items())
+            print(f'{key:24} {details}')
+        elif isinstance(value, float):
+            print(f'{key:24} {value:.3f}')
+        else:
+            print(f'{key:24} {value}')
+
+
+def flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """Flatten nested benchmark results.
+
+    Args:
+        results: benchmark results
+        prefix: key prefix
+
+    Returns:
+        numeric results by dotted keys
+
+    """
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, (int, float)):
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare results with saved baseline results.
+
+    Args:
+        results: benchmark results
+        baseline: baseline benchmark results
+        tolerance: allowed relative regression
+
+    Returns:
+        descriptions of regressions
+
+    """
+    regressions = []
+    flat_baseline = flatten(baseline)
+    for key, value in flatten(results).items():
+        base = flat_baseline.get(key)
+        if not base:
+            continue
+        higher_is_better = key.endswith('_per_s')
+        ratio = base / value if higher_is_better else value / base
+        if ratio > 1 + tolerance:
+            regressions.append(f'{key}: {value:.3f} (baseline {base:.3f})')
+    return regressions
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Run benchmarks from the command line.
+
+    Args:
+        argv: command line arguments (``sys.argv`` if None)
+
+    Returns:
+        exit code
+
+    """
+    parser = argparse.ArgumentParser(description='Country normalization benchmarks')
+    parser.add_argument('--engine', default='whoosh', help='fuzzy search engine')
+    parser.add_argument('--typos', type=int, default=300, help='number of names with typos')
+    parser.add_argument('--repeat', type=int, default=20, help='exact hit and batch repeats')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for typos')
+    parser.add_argument('--no-memory', action='store_true', help="don't measure peak memory")
+    parser.add_argument('--json', help='save results to a json file')
+    parser.add_argument('--compare', help='compare results with a saved json file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('dicountries').setLevel(logging.ERROR)
+    results = run(args)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'wt', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'rt', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
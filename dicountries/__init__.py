@@ -20,32 +20,146 @@ Usage example::
     print(country_index.normalize_country('Korea, Republic of'))
     print(country_index.refine_country('Korea, Republic of'))
 
+Submodules and their public names (e.g. ``dicountries.CountryIndex``) are imported on
+the first access, so ``import dicountries`` doesn't import whoosh and other heavy
+dependencies and doesn't configure logging.
+
 """
 
-# flake8: noqa: F401, F403
+import importlib
+from typing import Any, List
+
+from dicountries.metadata import version as __version__  # noqa: F401
+
+#: Submodules imported on the first access as attributes of the package.
+_SUBMODULES = frozenset(
+    [
+        'backup',
+        'base_types',
+        'cache',
+        'dict_index',
+        'fuzzy_index',
+        'loader',
+        'metadata',
+        'metrics',
+        'pandas',
+        'parallel',
+        'prefilter',
+        'query_budget',
+        'scorers',
+        'snapshot',
+        'string_table',
+        'tracing',
+        'utils',
+        'whoosh_index',
+        'whoosh_patches',
+    ]
+)
+
+#: Public names of the submodules available as attributes of the package.
+_EXPORTS = dict(
+    backup=[
+        'MappedStorage',
+        'MemoryStorage',
+        'get_backup_dir',
+        'load_manifest',
+        'read_storage_files',
+        'write_backup',
+    ],
+    base_types=[
+        'DictDB',
+        'FieldsDescription',
+        'Index',
+        'JSONType',
+        'ListDB',
+        'SimpleDB',
+        'SplitPolicies',
+        'StringMap',
+    ],
+    dict_index=[
+        'add_base_country',
+        'chain_indexes',
+        'create_dict_db',
+        'create_index',
+        'fold_index',
+        'get_keys',
+        'group_folded_keys',
+        'merge_indexes',
+        'normalize_keys',
+        'print_index',
+        'print_names_with_comma',
+        'reverse_index',
+        'update_folded_index',
+    ],
+    loader=[
+        'SUPER_INDEX_DATA_FILES',
+        'create_basename_by_code_index',
+        'create_basename_by_name_super_index',
+        'get_json_data',
+        'get_raw_data',
+        'load_country_old_db',
+        'load_country_region_db',
+        'load_main_country_db',
+        'load_post_process_country_mapping',
+        'restore_index',
+        'save_index',
+    ],
+    metrics=['DEFAULT_BUCKETS', 'Histogram', 'Metrics', 'PATHS'],
+    prefilter=['Prefilter', 'get_trigrams'],
+    query_budget=[
+        'DEFAULT_QUERY_BUDGET',
+        'DeadlineCollector',
+        'DeadlineFuzzyTerm',
+        'QueryBudget',
+        'search_until',
+    ],
+    string_table=['StringTable', 'load_string_tables', 'save_string_tables'],
+    tracing=['Stage', 'Trace'],
+    utils=['clean_name', 'clean_sort_name', 'fold_name', 'get_main_code', 'reorder_name'],
+    whoosh_index=[
+        'COUNTRY_IX_VER',
+        'DEFAULT_MAX_ASYNC_WORKERS',
+        'DEFAULT_MAX_SEARCH_CACHE',
+        'CountryIndex',
+        'IndexState',
+    ],
+)
+
+#: Submodule names by the exported names.
+_ATTRIBUTES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+#: Names imported by ``from dicountries import *`` (the submodules are not imported,
+#: some of them have optional dependencies).
+__all__ = sorted(_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    """Import submodules and their public names on the first access (see PEP 562).
+
+    Args:
+        name: attribute name
 
-from dicountries.metadata import version as __version__
+    Raises:
+        AttributeError: if there is no such submodule or exported name
 
+    Returns:
+        the submodule or the exported object
 
-def _need_import():
-    import inspect  # pylint: disable=import-outside-toplevel
+    """
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name not in _ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'{__name__}.{_ATTRIBUTES[name]}'), name)
+    globals()[name] = value
+    return value
 
-    import __main__  # pylint: disable=import-outside-toplevel
 
-    stack = inspect.stack(0)
-    try:
-        for entry in stack:
-            if hasattr(entry, 'function') and entry.function == 'load_metadata':
-                return False
-    finally:
-        del stack
-    return __main__.__file__ != 'setup.py'
+def __dir__() -> List[str]:
+    """List the package attributes including not imported yet ones.
 
+    Returns:
+        attribute names
 
-if _need_import():
-    from dicountries.whoosh_patches import *  # isort:skip
-    from dicountries.base_types import *
-    from dicountries.dict_index import *
-    from dicountries.loader import *
-    from dicountries.utils import *
-    from dicountries.whoosh_index import *
+    """
+    return sorted(set(globals()) | _SUBMODULES | set(_ATTRIBUTES))
@@ -0,0 +1,306 @@
+"""Command line interface.
+
+Normalize country names from a text file (one name per line) or from a column of a csv file
+and write the results as soon as every chunk of names is processed::
+
+    % python -m dicountries normalize countries.txt
+    % cat data.csv | python -m dicountries normalize --column country --refine > result.csv
+    % python -m dicountries normalize --detailed countries.txt > result.jsonl
+
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .fuzzy_index import FUZZY_INDEXES
+from .whoosh_index import CountryIndex
+
+#: Default number of names normalized at once.
+DEFAULT_CHUNK_SIZE = 1000
+
+#: Default number of variants written for every name in the detailed mode.
+DEFAULT_DETAILED_LIMIT = 5
+
+
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Split items to chunks without reading all of them to memory.
+
+    Args:
+        items: items to split
+        chunk_size: max chunk size
+
+    Yields:
+        lists of items
+
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def positive_int(value: str) -> int:
+    """Parse a positive integer command line argument.
+
+    Args:
+        value: argument value
+
+    Raises:
+        argparse.ArgumentTypeError: if the value is not a positive integer
+            (the parser reports it as a usage error)
+
+    Returns:
+        parsed value
+
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a positive integer')
+    return number
+
+
+def normalize_names(
+    country_index: CountryIndex, names: List[str], args: argparse.Namespace
+) -> List[str]:
+    """Normalize a chunk of names accordingly to the command line options.
+
+    Args:
+        country_index: country index
+        names: names to normalize
+        args: parsed command line arguments
+
+    Returns:
+        normalized names
+
+    """
+    if args.refine:
+        return country_index.refine_countries(names)
+    return country_index.normalize_countries(names, postprocess=args.postprocess)
+
+
+def write_detailed(
+    country_index: CountryIndex,
+    names: List[str],
+    args: argparse.Namespace,
+    output: IO[str],
+) -> None:
+    """Write json line with search details for every name.
+
+    Fuzzy search is skipped for the names found in the direct indexes, their only
+    result is the found name. The normalized name is the best result postprocessed
+    or refined accordingly to the command line options.
+
+    Args:
+        country_index: country index
+        names: names to normalize
+        args: parsed command line arguments
+        output: output stream
+
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    for name in dict.fromkeys(names):
+        stripped = name.strip()
+        basename = country_index.find_country(stripped, postprocess=False)
+        if basename is not None:
+            count, results = 1, [dict(basecountry=basename, country=stripped, rate=100)]
+        else:
+            count, results = country_index.normalize_country_detailed(stripped, limit=args.limit)
+            basename = results[0]['basecountry'] if results else stripped
+        if args.refine:
+            normalized = country_index.refine_name(basename)
+        else:
+            normalized = country_index.post_process_name(basename, args.postprocess)
+        records[name] = dict(name=name, normalized=normalized, count=count, results=results)
+    for name in names:
+        output.write(json.dumps(records[name], ensure_ascii=False))
+        output.write('\n')
+
+
+def normalize_lines(
+    country_index: CountryIndex, args: argparse.Namespace, source: IO[str], output: IO[str]
+) -> None:
+    """Normalize names from a text stream (one name per line).
+
+    Args:
+        country_index: country index
+        args: parsed command line arguments
+        source: input stream
+        output: output stream
+
+    """
+    lines = (line.rstrip('\r\n') for line in source)
+    for names in iter_chunks(lines, args.chunk_size):
+        if args.detailed:
+            write_detailed(country_index, names, args, output)
+        else:
+            for normalized in normalize_names(country_index, names, args):
+                output.write(normalized)
+                output.write('\n')
+        output.flush()
+
+
+def normalize_csv(
+    country_index: CountryIndex, args: argparse.Namespace, source: IO[str], output: IO[str]
+) -> None:
+    """Normalize names from a column of a csv stream.
+
+    The input rows are written with an additional column containing normalized names
+    or a json line with search details is written for every row in the detailed mode.
+
+    Args:
+        country_index: country index
+        args: parsed command line arguments
+        source: input stream
+        output: output stream
+
+    Raises:
+        SystemExit: if there is no such column in the csv header
+
+    """
+    reader = csv.reader(source, delimiter=args.delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    if args.column not in header:
+        raise SystemExit(f'Column {args.column} is not found in the csv header')
+    column = header.index(args.column)
+    writer = None
+    if not args.detailed:
+        writer = csv.writer(output, delimiter=args.delimiter, lineterminator='\n')
+        writer.writerow(header + [args.output_column or f'{args.column}_normalized'])
+    for rows in iter_chunks(reader, args.chunk_size):
+        names = [row[column] if column < len(row) else '' for row in rows]
+        if writer is None:
+            write_detailed(country_index, names, args, output)
+        else:
+            normalized = normalize_names(country_index, names, args)
+            writer.writerows(row + [name] for row, name in zip(rows, normalized))
+        output.flush()
+
+
+def normalize(args: argparse.Namespace) -> None:
+    """Run the ``normalize`` command.
+
+    Args:
+        args: parsed command line arguments
+
+    """
+    country_index = CountryIndex(index_path=args.index_path, engine=args.engine)
+    if args.refresh:
+        country_index.refresh()
+    newline = '' if args.column is not None else None  # the csv module requires newline=''
+    if args.input != '-':
+        source = open(args.input, 'rt', encoding=args.encoding, newline=newline)
+    else:
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding=args.encoding, newline=newline)
+    output = sys.stdout
+    if args.output != '-':
+        output = open(args.output, 'wt', encoding=args.encoding, newline='')
+    try:
+        if args.column is None:
+            normalize_lines(country_index, args, source, output)
+        else:
+            normalize_csv(country_index, args, source, output)
+    finally:
+        if args.input != '-':
+            source.close()
+        else:
+            source.detach()  # don't close the standard input
+        if output is not sys.stdout:
+            output.close()
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create command line argument parser.
+
+    Returns:
+        argument parser
+
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m dicountries', description=__doc__.split('\n')[0]
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    normalize_parser = subparsers.add_parser('normalize', help='normalize country names')
+    normalize_parser.set_defaults(func=normalize)
+    normalize_parser.add_argument(
+        'input', nargs='?', default='-', help='input file (standard input by default)'
+    )
+    normalize_parser.add_argument(
+        '-o', '--output', default='-', help='output file (standard output by default)'
+    )
+    normalize_parser.add_argument(
+        '-c', '--column', help='csv column to normalize (input is a text file if omitted)'
+    )
+    normalize_parser.add_argument(
+        '--output-column', help='csv column for the normalized names (<column>_normalized)'
+    )
+    normalize_parser.add_argument('-d', '--delimiter', default=',', help='csv delimiter')
+    normalize_parser.add_argument('--encoding', default='utf-8', help='files encoding')
+    normalize_parser.add_argument(
+        '--refine', action='store_true', help='refine names (see CountryIndex.refine_country)'
+    )
+    normalize_parser.add_argument(
+        '--no-postprocess',
+        dest='postprocess',
+        action='store_false',
+        help="don't postprocess normalized names",
+    )
+    normalize_parser.add_argument(
+        '--detailed', action='store_true', help='write search details as json lines'
+    )
+    normalize_parser.add_argument(
+        '--limit',
+        type=positive_int,
+        default=DEFAULT_DETAILED_LIMIT,
+        help='number of search variants written in the detailed mode',
+    )
+    normalize_parser.add_argument(
+        '--chunk-size',
+        type=positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help='number of names normalized at once',
+    )
+    normalize_parser.add_argument('--index-path', help='index backup path')
+    normalize_parser.add_argument(
+        '--engine',
+        default='whoosh',
+        choices=['whoosh', *FUZZY_INDEXES],
+        help='fuzzy search engine',
+    )
+    normalize_parser.add_argument(
+        '--refresh', action='store_true', help='rebuild the index before normalization'
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run command line interface.
+
+    Args:
+        argv: command line arguments (``sys.argv`` if None)
+
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'input', '-') != '-' and not os.path.isfile(args.input):
+        parser.error(f'input file {args.input} is not found')
+    logging.basicConfig(format='%(levelname)s  dicountries: %(message)s')
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+"""Crash safe on disk backups of the whoosh index files.
+
+Every backup is written to a temporary directory inside the backup directory,
+the files are flushed to disk and the directory is renamed to a new generation directory.
+Then a manifest with the generation name and the file sizes and hashes is atomically
+replaced, so a process killed in the middle of a backup leaves the previous backup intact.
+Segment files not changed since the previous generation are hard linked instead of copied.
+The processes sharing the backup directory serialize their backups with a lock file
+(on the platforms supporting :py:mod:`fcntl`).
+
+A backup generation can be served without copying it to memory with
+:py:class:`MappedStorage` (the files are memory mapped, so the processes serving the same
+backup share the page cache pages).
+
+Backup directory layout::
+
+    <backup path>/MANIFEST.json
+    <backup path>/.lock
+    <backup path>/gen-000002/<whoosh index files>
+
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NoReturn, Optional
+
+from whoosh.filedb.filestore import RamStorage, ReadOnlyError, Storage
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger('dicountries')
+
+BACKUP_VER = 1  # change this if you've changed the backup layout or the manifest format
+
+MANIFEST_NAME = 'MANIFEST.json'
+
+GENERATION_PREFIX = 'gen-'
+
+TMP_PREFIX = '.tmp-'
+
+LOCK_NAME = '.lock'
+
+#: Age in seconds after which a temporary directory of another writer is treated as abandoned
+#: (used only if the lock file can't be locked).
+STALE_TMP_AGE = 3600
+
+
+class MemoryStorage(RamStorage):
+    """Whoosh RAM storage keeping the temporary files of the index writers in memory too.
+
+    :py:class:`whoosh.filedb.filestore.RamStorage` writes them to a directory named after
+    the index in the system temporary directory, so the processes building indexes at the same
+    time remove each other's temporary files.
+    """
+
+    def temp_storage(self, name: Optional[str] = None) -> RamStorage:
+        return RamStorage()
+
+
+class MappedStorage(RamStorage):
+    """Read-only whoosh storage with memory mapped files of a backup generation.
+
+    All files are mapped once on creation, so the searchers opened later don't read the disk
+    and the generation directory can be removed by the next backup while the storage is used
+    (on POSIX systems).
+
+    Args:
+        path: directory with the whoosh index files
+
+    """
+
+    readonly = True
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.folder = path
+        for name in os.listdir(path):
+            with open(os.path.join(path, name), 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self.files[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self.files[name] = b''  # empty files can't be mapped
+
+    def create_file(self, name: str, **kwargs: Any) -> NoReturn:
+        raise ReadOnlyError
+
+    def delete_file(self, name: str) -> NoReturn:
+        raise ReadOnlyError
+
+    def rename_file(self, name: str, newname: str, safe: bool = False) -> NoReturn:
+        raise ReadOnlyError
+
+    def clean(self) -> NoReturn:
+        raise ReadOnlyError
+
+
+def read_storage_files(storage: Storage) -> Dict[str, Any]:
+    """Read all files of a whoosh storage.
+
+    The files of a :py:class:`whoosh.filedb.filestore.RamStorage` are immutable bytes
+    objects (or read-only maps of :py:class:`MappedStorage`), so they are not copied
+    (only the references are read).
+
+    Args:
+        storage: whoosh storage
+
+    Returns:
+        file contents by file names
+
+    """
+    if isinstance(storage, RamStorage):
+        return dict(storage.files)
+    files = {}
+    for name in storage.list():
+        with storage.open_file(name) as f:
+            files[name] = f.read()
+    return files
+
+
+def describe_file(content: bytes) -> Dict[str, Any]:
+    """Describe a file content for the backup manifest.
+
+    Args:
+        content: file content
+
+    Returns:
+        size and sha256 hash of the content
+
+    """
+    return dict(size=len(content), sha256=hashlib.sha256(content).hexdigest())
+
+
+def _fsync_dir(path: str) -> None:
+    """Flush a directory entry changes to disk (if the platform supports it).
+
+    Args:
+        path: directory path
+
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_file(path: str, content: bytes) -> None:
+    """Write a file and flush it to disk.
+
+    Args:
+        path: file path
+        content: file content
+
+    """
+    with open(path, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _is_valid_manifest(manifest: Dict[str, Any]) -> bool:
+    """Check the structure of the manifest of the current backup version.
+
+    Args:
+        manifest: parsed manifest
+
+    Returns:
+        True if the manifest names a generation directory and describes its files
+
+    """
+    generation = manifest.get('generation')
+    files = manifest.get('files')
+    if not isinstance(generation, str) or not generation.startswith(GENERATION_PREFIX):
+        return False
+    if os.path.basename(generation) != generation or not isinstance(files, dict):
+        return False
+    for name, description in files.items():
+        if os.path.basename(name) != name or not isinstance(description, dict):
+            return False
+        if not isinstance(description.get('size'), int):
+            return False
+        if not isinstance(description.get('sha256'), str):
+            return False
+    return True
+
+
+def _is_intact(file_path: str, description: Dict[str, Any], verify_hashes: bool) -> bool:
+    """Check a backup file against its manifest description.
+
+    Args:
+        file_path: path of the backup file
+        description: size and sha256 hash from the manifest
+        verify_hashes: compare the content hashes, not only the sizes
+
+    Returns:
+        True if the file exists and matches the description
+
+    """
+    try:
+        if not verify_hashes:
+            return os.path.getsize(file_path) == description['size']
+        with open(file_path, 'rb') as f:
+            return describe_file(f.read()) == description
+    except OSError:
+        return False
+
+
+def load_manifest(path: str, verify_hashes: bool = True) -> Optional[Dict[str, Any]]:
+    """Load and verify the manifest of the backup.
+
+    Args:
+        path: backup directory
+        verify_hashes: read and hash every file of the generation; if False, only the file
+            sizes are checked, which is enough to attach the memory mapped files quickly
+            (the generation files are flushed to disk before the manifest is published)
+
+    Returns:
+        the manifest or None if there is no manifest or the backup is outdated or broken
+
+    """
+    try:
+        with open(os.path.join(path, MANIFEST_NAME), 'rt', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get('version') != BACKUP_VER:
+        logger.info('* Outdated index backup %s', path)
+        return None
+    if not _is_valid_manifest(manifest):
+        logger.warning('Broken index backup %s: %s', path, MANIFEST_NAME)
+        return None
+    generation_path = os.path.join(path, manifest['generation'])
+    for name, description in manifest['files'].items():
+        if not _is_intact(os.path.join(generation_path, name), description, verify_hashes):
+            logger.warning('Broken index backup %s: %s', path, name)
+            return None
+    return manifest
+
+
+def get_backup_dir(path: str, verify_hashes: bool = True) -> Optional[str]:
+    """Get the directory of the current backup generation.
+
+    Args:
+        path: backup directory
+        verify_hashes: verify the file hashes, not only the sizes (see :py:func:`load_manifest`)
+
+    Returns:
+        directory with the whoosh index files or None if there is no valid backup
+
+    """
+    manifest = load_manifest(path, verify_hashes)
+    if manifest is None:
+        return None
+    return os.path.join(path, manifest['generation'])
+
+
+@contextmanager
+def _lock_backup_dir(path: str) -> Iterator[bool]:
+    """Hold the exclusive lock of the backup directory shared by the processes.
+
+    Args:
+        path: backup directory
+
+    Yields:
+        True if the lock is held (False if the platform doesn't support :py:mod:`fcntl`)
+
+    """
+    with open(os.path.join(path, LOCK_NAME), 'ab') as f:
+        if fcntl is None:  # pragma: no cover
+            yield False
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _is_removable(path: str, name: str, generation: str, locked: bool) -> bool:
+    """Check if an entry of the backup directory is left by the previous backups.
+
+    Args:
+        path: backup directory
+        name: entry name
+        generation: current generation name
+        locked: True if the backup directory lock is held, so no other process is writing
+
+    Returns:
+        True for the old generations and the temporary directories of the finished
+        (or abandoned) writers
+
+    """
+    if name == generation:
+        return False
+    if name.startswith(GENERATION_PREFIX):
+        return True
+    if not name.startswith(TMP_PREFIX):
+        return False
+    try:
+        return locked or time.time() - os.path.getmtime(os.path.join(path, name)) > STALE_TMP_AGE
+    except OSError:
+        return False
+
+
+def write_backup(path: str, files: Dict[str, Any]) -> str:
+    """Write a new backup generation and publish it by replacing the manifest.
+
+    Can be called concurrently by several processes for the same backup directory,
+    the backups are written one by one holding the directory lock.
+
+    Args:
+        path: backup directory
+        files: file contents (bytes like objects) by file names
+
+    Returns:
+        directory of the new generation
+
+    """
+    os.makedirs(path, exist_ok=True)
+    with _lock_backup_dir(path) as locked:
+        return _write_backup_locked(path, files, locked)
+
+
+def _rename_generation(path: str, tmp_path: str, number: int) -> str:
+    """Rename a written temporary directory to the first free generation directory.
+
+    Args:
+        path: backup directory
+        tmp_path: written temporary directory
+        number: number of the generation to start with
+
+    Returns:
+        generation name
+
+    """
+    while True:
+        generation = f'{GENERATION_PREFIX}{number:06d}'
+        generation_path = os.path.join(path, generation)
+        try:
+            os.rename(tmp_path, generation_path)
+            break
+        except OSError:
+            if not os.path.exists(generation_path):
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                raise
+            number += 1  # taken by a writer without the lock
+    _fsync_dir(path)
+    return generation
+
+
+def _write_backup_locked(path: str, files: Dict[str, Any], locked: bool) -> str:
+    """Write a new backup generation (see :py:func:`write_backup`).
+
+    Args:
+        path: backup directory
+        files: file contents (bytes like objects) by file names
+        locked: True if the backup directory lock is held
+
+    Returns:
+        directory of the new generation
+
+    """
+    manifest = load_manifest(path)
+    prev_path = os.path.join(path, manifest['generation']) if manifest else None
+    prev_files = manifest['files'] if manifest else {}
+    numbers = [
+        int(name[len(GENERATION_PREFIX) :])
+        for name in os.listdir(path)
+        if name.startswith(GENERATION_PREFIX) and name[len(GENERATION_PREFIX) :].isdigit()
+    ]
+    number = max(numbers, default=0) + 1
+
+    tmp_path = tempfile.mkdtemp(prefix=f'{TMP_PREFIX}{os.getpid()}-', dir=path)
+    descriptions = {}
+    for name, content in files.items():
+        file_path = os.path.join(tmp_path, name)
+        description = describe_file(content)
+        descriptions[name] = description
+        if prev_path and prev_files.get(name) == description:
+            try:
+                os.link(os.path.join(prev_path, name), file_path)
+                continue
+            except OSError:
+                pass
+        _write_file(file_path, content)
+    _fsync_dir(tmp_path)
+
+    generation = _rename_generation(path, tmp_path, number)
+    generation_path = os.path.join(path, generation)
+
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    manifest_tmp_path = f'{manifest_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    content = json.dumps(dict(version=BACKUP_VER, generation=generation, files=descriptions))
+    _write_file(manifest_tmp_path, content.encode('utf-8'))
+    os.replace(manifest_tmp_path, manifest_path)
+    _fsync_dir(path)
+
+    for name in os.listdir(path):
+        if _is_removable(path, name, generation, locked):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        elif name.endswith(('.seg', '.toc')):  # files of the backups without generations
+            os.remove(os.path.join(path, name))
+    return generation_path
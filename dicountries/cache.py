@@ -0,0 +1,169 @@
+"""Bounded thread safe cache used to save fuzzy search results."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Collection, Dict, Hashable, List, Optional, Tuple
+
+
+class SearchCache:
+    """LRU cache with an optional time to live for the entries.
+
+    All operations are thread safe. The cache counts hits, misses, evictions
+    (entries removed to respect the ``max_size`` limit) and expirations
+    (entries removed because their ``ttl`` has passed).
+
+    Args:
+        max_size: max number of entries. The least recently used entry is evicted when
+            a new entry is added to the full cache. Nothing is cached if it is not positive
+        ttl: time to live of the entries in seconds (None if entries never expire)
+
+    Usage example::
+
+        from dicountries.cache import SearchCache
+
+        cache = SearchCache(max_size=2, ttl=60)
+        cache.put('Rusia', 'Russian Federation')
+        print(cache.get('Rusia'))
+        print(cache.stats())
+
+    """
+
+    #: max number of entries.
+    max_size: int
+
+    #: time to live of the entries in seconds or None.
+    ttl: Optional[float]
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value and mark it as recently used.
+
+        Args:
+            key: cache key
+            default: value to return if there is no actual value for the ``key``
+
+        Returns:
+            cached value or ``default``
+
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            value, expires = entry
+            if self.ttl is not None and expires <= time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Save a value to the cache evicting the least recently used entries if required.
+
+        Args:
+            key: cache key
+            value: value to save
+
+        """
+        if self.max_size <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Remove an entry from the cache if it is present.
+
+        Args:
+            key: cache key
+
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        """Get keys of the cached entries (including expired but not removed yet ones).
+
+        Returns:
+            cache keys from the least to the most recently used
+
+        """
+        with self._lock:
+            return list(self._data)
+
+    def copy(
+        self,
+        exclude: Collection[Hashable] = (),
+        exclude_if: Optional[Callable[[Hashable], bool]] = None,
+    ) -> 'SearchCache':
+        """Create a new cache with the same settings and entries (the counters are not copied).
+
+        The entries are filtered while the cache is locked, so an entry added concurrently
+        is either checked or not copied.
+
+        Args:
+            exclude: keys of the entries which should not be copied
+            exclude_if: a check of the keys of the entries which should not be copied
+
+        Returns:
+            a new cache
+
+        """
+        cache = SearchCache(self.max_size, self.ttl)
+        with self._lock:
+            cache._data.update(  # pylint: disable=protected-access
+                (key, entry)
+                for key, entry in self._data.items()
+                if key not in exclude and (exclude_if is None or not exclude_if(key))
+            )
+        return cache
+
+    def clear(self) -> None:
+        """Remove all entries from the cache (the counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters.
+
+        Returns:
+            a dict with the ``hits``, ``misses``, ``evictions``, ``expirations``,
+            ``size`` and ``max_size`` values
+
+        """
+        with self._lock:
+            return dict(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._data),
+                max_size=self.max_size,
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+        return entry is not None and (self.ttl is None or entry[1] > time.monotonic())
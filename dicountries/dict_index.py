@@ -2,10 +2,10 @@
 
 import logging
 from copy import copy
-from typing import List, Set, Tuple, Union, cast
+from typing import Dict, Iterable, List, Set, Tuple, Union, cast
 
 from .base_types import DictDB, FieldsDescription, Index, ListDB, SimpleDB, SplitPolicies, StringMap
-from .utils import reorder_name
+from .utils import fold_name, reorder_name
 
 # try:
 #     from typing import Final  # type: ignore # isort: ignore # pylint: disable=no-name-in-module
@@ -23,7 +23,6 @@ REPORT_TEMPLATE_RECORDS_WITHOUT_DASH = (
 )
 
 logger = logging.getLogger('dicountries')
-logging.basicConfig(format='%(levelname)s  dicountries: %(message)s')
 
 
 def get_keys(db: SimpleDB) -> Set[str]:
@@ -288,6 +287,85 @@ def reverse_index(index: Index) -> Index:
     return {v: k for k, v in index.items()}
 
 
+def fold_index(index: Index) -> Index:
+    """Create an index with folded keys (see :py:func:`dicountries.utils.fold_name`).
+
+    Folded keys of several names with different values are ambiguous, so they are excluded.
+
+    Args:
+        index: a dict index
+
+    Returns:
+        a dict index with folded keys
+
+    """
+    folded_index: Index = {}
+    ambiguous: Set[str] = set()
+    for k, v in index.items():
+        key = fold_name(k)
+        if not key or key in ambiguous:
+            continue
+        if folded_index.setdefault(key, v) != v:
+            del folded_index[key]
+            ambiguous.add(key)
+    return folded_index
+
+
+def group_folded_keys(index: Index) -> Dict[str, Set[str]]:
+    """Group index keys by their folded form (see :py:func:`dicountries.utils.fold_name`).
+
+    Args:
+        index: a dict index
+
+    Returns:
+        index keys by folded keys (empty folded keys are skipped)
+
+    """
+    groups: Dict[str, Set[str]] = {}
+    for k in index:
+        key = fold_name(k)
+        if key:
+            groups.setdefault(key, set()).add(k)
+    return groups
+
+
+def update_folded_index(
+    folded_index: Index, index: Index, groups: Dict[str, Set[str]], keys: Iterable[str]
+) -> None:
+    """Update an index with folded keys (see :py:func:`fold_index`) after some keys
+    of the source index are added, changed or removed.
+
+    Only the folded keys of the changed keys are recalculated.
+
+    Args:
+        folded_index: a dict index with folded keys to update
+        index: the changed source index
+        groups: source index keys by folded keys before the change
+            (see :py:func:`group_folded_keys`), they are updated too
+        keys: added, changed or removed keys of the source index
+
+    """
+    folded_keys = set()
+    for k in keys:
+        key = fold_name(k)
+        if not key:
+            continue
+        group = groups.setdefault(key, set())
+        if k in index:
+            group.add(k)
+        else:
+            group.discard(k)
+        folded_keys.add(key)
+    for key in folded_keys:
+        values = {index[k] for k in groups[key]}
+        if len(values) == 1:
+            folded_index[key] = values.pop()
+        else:
+            folded_index.pop(key, None)
+        if not groups[key]:
+            del groups[key]
+
+
 def add_base_country(db: SimpleDB, source_field: str, dest_field: str) -> None:
     """Add base country field to database.
 
@@ -0,0 +1,495 @@
+"""Pure python fuzzy country search indexes.
+
+These indexes are an alternative to the whoosh index
+(see :py:class:`dicountries.whoosh_index.CountryIndex`) for small databases like the country
+one. They use the same tokenization, the same term typo limits and the same result
+rating as the whoosh index, but they don't have the whoosh query parsing and automata
+building overhead.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, cast
+
+from fuzzywuzzy.utils import full_process
+
+from .base_types import Index
+from .scorers import DEFAULT_SCORER, Scorer, top_k
+from .tracing import Trace
+from .utils import clean_name, clean_sort_name
+
+#: Stop words excluded from the indexed and searched names.
+COUNTRY_STOPLIST = frozenset(  # exclude us from standard stopwords
+    [
+        'and',
+        'is',
+        'it',
+        'an',
+        'as',
+        'at',
+        'have',
+        'in',
+        'yet',
+        'if',
+        'from',
+        'for',
+        'when',
+        'by',
+        'to',
+        'you',
+        'be',
+        'we',
+        'that',
+        'may',
+        'not',
+        'with',
+        'tbd',
+        'a',
+        'on',
+        'your',
+        'this',
+        'of',
+        'will',
+        'can',
+        'the',
+        'or',
+        'are',
+    ]
+)
+
+#: Term pattern (the same as used by the whoosh standard analyzer).
+TERM_PATTERN = re.compile(r'\w+(\.?\w+)*', re.UNICODE)
+
+#: Type hint for a search result: the number of found names and the rated names.
+SearchResults = Tuple[int, List[Any]]
+
+
+def analyze(text: str) -> List[str]:
+    """Split text to terms the same way as the whoosh standard analyzer does.
+
+    Args:
+        text: text to split
+
+    Returns:
+        lowercased terms without stop words and one letter terms
+
+    """
+    terms = []
+    for match in TERM_PATTERN.finditer(text):
+        term = match.group(0).lower()
+        if len(term) >= 2 and term not in COUNTRY_STOPLIST:
+            terms.append(term)
+    return terms
+
+
+def get_max_edits(term: str) -> int:
+    """Get the allowed number of typo mistakes as dependency on the term length.
+
+    Args:
+        term: searched term
+
+    Returns:
+        max edit distance for the term
+
+    """
+    if len(term) < 4:
+        return 0
+    if len(term) < 11:
+        return 1
+    if len(term) < 16:
+        return 2
+    return 3
+
+
+def get_max_deletes(term: str) -> int:
+    """Get the max number of deletes required to find the vocabulary term by a searched one.
+
+    A searched term can be longer than the vocabulary term and can have a larger typo limit
+    (see :py:func:`get_max_edits`).
+
+    Args:
+        term: vocabulary term
+
+    Returns:
+        max number of deletes
+
+    """
+    for max_dist in range(3, 0, -1):
+        if get_max_edits('_' * (len(term) + max_dist)) >= max_dist:
+            return max_dist
+    return 0
+
+
+def get_deletes(term: str, max_dist: int) -> Set[str]:
+    """Get all variants of the term with up to ``max_dist`` deleted symbols.
+
+    Args:
+        term: a term
+        max_dist: max number of deleted symbols
+
+    Returns:
+        the term and its variants with deleted symbols
+
+    """
+    variants = {term}
+    level = {term}
+    for _ in range(max_dist):
+        level = {
+            variant[:i] + variant[i + 1 :] for variant in level for i in range(len(variant))
+        }
+        variants.update(level)
+    return variants
+
+
+def edit_distance(s1: str, s2: str, max_dist: int) -> int:
+    """Calculate the Damerau-Levenshtein (optimal string alignment) distance.
+
+    Two next symbol transpositions are counted as one error
+    like in the patched whoosh automata (see :py:mod:`dicountries.whoosh_patches`).
+
+    Args:
+        s1: first string
+        s2: second string
+        max_dist: max interesting distance
+
+    Returns:
+        the distance or ``max_dist + 1`` if the distance is greater than ``max_dist``
+
+    """
+    if abs(len(s1) - len(s2)) > max_dist:
+        return max_dist + 1
+    prev_row: List[int] = []
+    row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        prev_prev_row, prev_row = prev_row, row
+        row = [i] + [0] * len(s2)
+        for j, c2 in enumerate(s2, 1):
+            cost = 0 if c1 == c2 else 1
+            row[j] = min(prev_row[j] + 1, row[j - 1] + 1, prev_row[j - 1] + cost)
+            if i > 1 and j > 1 and c1 == s2[j - 2] and s1[i - 2] == c2:
+                row[j] = min(row[j], prev_prev_row[j - 2] + 1)
+        if min(row) > max_dist:
+            return max_dist + 1
+    return min(row[-1], max_dist + 1)
+
+
+def get_sort_form(name: str) -> str:
+    """Get the cleaned form of the name with sorted tokens used to rate found names.
+
+    The :py:func:`fuzzywuzzy.fuzz.ratio` of two sort forms is equal to
+    the :py:func:`fuzzywuzzy.fuzz.token_sort_ratio` of the cleaned names, so the sort forms
+    of the indexed names are calculated once on indexing.
+
+    Args:
+        name: name to process
+
+    Returns:
+        the sort form of the name
+
+    """
+    return ' '.join(sorted(full_process(clean_sort_name(name), force_ascii=True).split()))
+
+
+def create_affected_name_check(changed_names: Iterable[str]) -> Callable[[str], bool]:
+    """Create a check if the search results of a name can contain some of the changed names.
+
+    The search results of a name can contain only indexed names having a term matching
+    some of the name terms with the allowed typo mistakes (see :py:func:`get_max_edits`).
+
+    Args:
+        changed_names: added, changed or removed indexed names
+
+    Returns:
+        a function returning True for the searched names which search results can be changed
+
+    """
+    changed_terms = {term for name in changed_names for term in analyze(clean_name(name))}
+
+    def is_affected(name: str) -> bool:
+        for term in analyze(clean_name(name)):
+            max_dist = get_max_edits(term)
+            if any(edit_distance(term, other, max_dist) <= max_dist for other in changed_terms):
+                return True
+        return False
+
+    return is_affected
+
+
+def get_affected_names(names: Iterable[str], changed_names: Iterable[str]) -> Set[str]:
+    """Find searched names which search results can contain some of the changed names
+    (see :py:func:`create_affected_name_check`).
+
+    Args:
+        names: searched names
+        changed_names: added, changed or removed indexed names
+
+    Returns:
+        searched names which search results can be changed
+
+    """
+    is_affected = create_affected_name_check(changed_names)
+    return {name for name in names if is_affected(name)}
+
+
+def rate_names(
+    name: str,
+    hits: Iterable[Tuple[str, str, str]],
+    limit: Optional[int] = None,
+    scorer: Optional[Scorer] = None,
+    trace: Optional[Trace] = None,
+) -> SearchResults:
+    """Rate found names comparing them with the searched name.
+
+    All the found names are scored at once by the ``scorer``, but only the best ``limit``
+    results are sorted and returned.
+
+    Args:
+        name: searched name
+        hits: found (name, base name, sort form) triples (see :py:func:`get_sort_form`)
+        limit: How many results should be returned (None to return all results)
+        scorer: scorer to rate the names
+            (:py:data:`dicountries.scorers.DEFAULT_SCORER` if None)
+        trace: trace to mark the **stored_fields**, **rerank** and **sort** stages
+
+    Returns:
+        the number of found names and the list of dicts with ``basecountry``, ``country``
+        and ``rate`` keys sorted by the rate
+
+    """
+    hits = list(hits)
+    if trace is not None:
+        trace.mark('stored_fields', len(hits))
+    scores = (scorer or DEFAULT_SCORER).score(get_sort_form(name), [hit[2] for hit in hits])
+    if trace is not None:
+        trace.mark('rerank', len(scores))
+    try:
+        limit = int(cast(int, limit))
+    except (ValueError, TypeError):
+        limit = None
+    results = [
+        dict(basecountry=hits[i][1], country=hits[i][0], rate=scores[i])
+        for i in top_k(scores, limit)
+    ]
+    if trace is not None:
+        trace.mark('sort', len(results))
+    return len(hits), results
+
+
+class FuzzyIndex(ABC):
+    """Base class for pure python fuzzy country indexes.
+
+    Subclasses define how typo variants of a term are found in the index vocabulary.
+
+    Args:
+        index: basename by name index to search in
+
+    """
+
+    #: indexed names.
+    names: List[str]
+
+    #: base names of the indexed names.
+    basenames: List[str]
+
+    #: sort forms of the indexed names (see :py:func:`get_sort_form`).
+    sort_forms: List[str]
+
+    #: name ids by term.
+    postings: Dict[str, Set[int]]
+
+    def __init__(self, index: Index):
+        self.names = []
+        self.basenames = []
+        self.sort_forms = []
+        self.postings = defaultdict(set)
+        for doc_id, (name, basename) in enumerate(index.items()):
+            self.names.append(name)
+            self.basenames.append(basename)
+            self.sort_forms.append(get_sort_form(name))
+            for term in analyze(clean_name(name)):
+                self.postings[term].add(doc_id)
+        self.postings = dict(self.postings)
+
+    @abstractmethod
+    def expand_term(self, term: str) -> List[str]:
+        """Find vocabulary terms matching the term with allowed typo mistakes.
+
+        Args:
+            term: searched term
+
+        Returns:
+            matching vocabulary terms
+
+        """
+
+    def _find(self, terms: List[str]) -> Set[int]:
+        """Find names containing all the terms or, if there are no such names, any of the terms.
+
+        Args:
+            terms: searched terms
+
+        Returns:
+            found name ids
+
+        """
+        term_docs: List[Set[int]] = []
+        for term in dict.fromkeys(terms):
+            docs: Set[int] = set()
+            for variant in self.expand_term(term):
+                docs.update(self.postings[variant])
+            term_docs.append(docs)
+        found = set.intersection(*sorted(term_docs, key=len))
+        if not found:
+            found = set.union(*term_docs)
+        return found
+
+    def search(
+        self,
+        name: str,
+        limit: Optional[int] = None,
+        scorer: Optional[Scorer] = None,
+        trace: Optional[Trace] = None,
+    ) -> SearchResults:
+        """Search the name in the index.
+
+        Args:
+            name: country name to normalize
+            limit: How many results should be searched (None to find all possible results)
+            scorer: scorer to rate the found names (see :py:func:`rate_names`)
+            trace: trace to mark the search stages (see :py:mod:`dicountries.tracing`)
+
+        Returns:
+            All possible variants from the index for the name and their rates
+            (the same as :py:meth:`dicountries.whoosh_index.CountryIndex.normalize_country_detailed`
+            returns).
+
+        """
+        terms = analyze(clean_name(name))
+        if trace is not None:
+            trace.mark('clean', len(terms))
+        if not terms:
+            return 0, []
+        found = sorted(self._find(terms))
+        if trace is not None:
+            trace.mark('search', len(found))
+        hits = ((self.names[i], self.basenames[i], self.sort_forms[i]) for i in found)
+        return rate_names(name, hits, limit, scorer, trace)
+
+
+class NgramIndex(FuzzyIndex):
+    """Fuzzy country index using q-gram candidate generation and edit distance verification.
+
+    The vocabulary terms sharing enough q-grams with a searched term are verified with
+    the :py:func:`edit_distance` function.
+
+    Args:
+        index: basename by name index to search in
+        q: q-gram length
+
+    """
+
+    #: q-gram length.
+    q: int
+
+    #: vocabulary terms by the term length and q-gram.
+    gram_postings: Dict[Tuple[int, str], List[str]]
+
+    #: vocabulary terms by the term length.
+    terms_by_length: Dict[int, List[str]]
+
+    def __init__(self, index: Index, q: int = 2):
+        super().__init__(index)
+        self.q = q
+        gram_postings: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+        terms_by_length: Dict[int, List[str]] = defaultdict(list)
+        for term in self.postings:
+            terms_by_length[len(term)].append(term)
+            for gram in self.get_grams(term):
+                gram_postings[len(term), gram].append(term)
+        self.gram_postings = dict(gram_postings)
+        self.terms_by_length = dict(terms_by_length)
+
+    def get_grams(self, term: str) -> Set[str]:
+        """Get q-grams of the term padded by special symbols.
+
+        Args:
+            term: a term
+
+        Returns:
+            set of the term q-grams
+
+        """
+        padding = '\0' * (self.q - 1)
+        term = f'{padding}{term}{padding}'
+        return {term[i : i + self.q] for i in range(len(term) - self.q + 1)}
+
+    def expand_term(self, term: str) -> List[str]:
+        max_dist = get_max_edits(term)
+        if not max_dist:
+            return [term] if term in self.postings else []
+        grams = self.get_grams(term)
+        # one edit (including a transposition) changes at most q + 1 q-grams
+        threshold = len(grams) - max_dist * (self.q + 1)
+        lengths = range(len(term) - max_dist, len(term) + max_dist + 1)
+        candidates: Iterable[str]
+        if threshold > 0:
+            counts: Dict[str, int] = defaultdict(int)
+            for length in lengths:
+                for gram in grams:
+                    for candidate in self.gram_postings.get((length, gram), ()):
+                        counts[candidate] += 1
+            candidates = [candidate for candidate, count in counts.items() if count >= threshold]
+        else:
+            candidates = [
+                candidate
+                for length in lengths
+                for candidate in self.terms_by_length.get(length, ())
+            ]
+        return [
+            candidate
+            for candidate in candidates
+            if edit_distance(term, candidate, max_dist) <= max_dist
+        ]
+
+
+class SymSpellIndex(FuzzyIndex):
+    """Fuzzy country index using the symmetric delete algorithm.
+
+    Variants with deleted symbols are precomputed for every vocabulary term,
+    so the typo variants of a searched term are found with a few dict lookups of
+    the searched term variants with deleted symbols. The found candidates are verified with
+    the :py:func:`edit_distance` function.
+
+    Args:
+        index: basename by name index to search in
+
+    """
+
+    #: vocabulary terms by their variants with deleted symbols.
+    deletes: Dict[str, List[str]]
+
+    def __init__(self, index: Index):
+        super().__init__(index)
+        deletes: Dict[str, List[str]] = defaultdict(list)
+        for term in self.postings:
+            for variant in get_deletes(term, get_max_deletes(term)):
+                deletes[variant].append(term)
+        self.deletes = dict(deletes)
+
+    def expand_term(self, term: str) -> List[str]:
+        max_dist = get_max_edits(term)
+        if not max_dist:
+            return [term] if term in self.postings else []
+        candidates: Set[str] = set()
+        for variant in get_deletes(term, max_dist):
+            candidates.update(self.deletes.get(variant, ()))
+        return [
+            candidate
+            for candidate in candidates
+            if edit_distance(term, candidate, max_dist) <= max_dist
+        ]
+
+
+#: Pure python fuzzy index classes by engine name.
+FUZZY_INDEXES = dict(ngram=NgramIndex, symspell=SymSpellIndex)
@@ -1,6 +1,8 @@
 """Loader for text and json databases."""
 
 import json
+import os
+import uuid
 from typing import List
 
 from .base_types import JSONType, StringMap
@@ -14,16 +16,17 @@ from .dict_index import (
     merge_indexes,
     normalize_keys,
 )
+from .utils import get_main_code
 
 
-def get_json_data(file_name: str) -> JSONType:
-    """Load some json data saved with the package as string.
+def get_raw_data(file_name: str) -> bytes:
+    """Load some data saved with the package as bytes.
 
     Args:
-        file_name: a path to json file
+        file_name: a path to the data file
 
     Returns:
-        Loaded json content
+        Loaded file content
 
     Note:
         This functions supports any package location, including zipfiles and so on.
@@ -35,8 +38,25 @@ def get_json_data(file_name: str) -> JSONType:
 
     from .metadata import name  # pylint: disable=import-outside-toplevel
 
-    data = pkgutil.get_data(name, f'data/{file_name}') or b''
-    return json.loads(data.decode('utf-8'))
+    return pkgutil.get_data(name, f'data/{file_name}') or b''
+
+
+def get_json_data(file_name: str) -> JSONType:
+    """Load some json data saved with the package as string.
+
+    Args:
+        file_name: a path to json file
+
+    Returns:
+        Loaded json content
+
+    Note:
+        This functions supports any package location, including zipfiles and so on.
+        It uses :py:mod:`pkgutil` functions to load data from the ``data``
+        subdirectory of the :py:mod:`dicountires` module
+
+    """
+    return json.loads(get_raw_data(file_name).decode('utf-8'))
 
 
 #: Mapping for main_country db field names
@@ -101,6 +121,16 @@ def load_country_old_db() -> DictDB:
     )
 
 
+#: Data files used to create the super index
+#: (see :py:func:`create_basename_by_name_super_index`)
+SUPER_INDEX_DATA_FILES = (
+    'iso3166-1.json',
+    'iso3166-2.json',
+    'iso3166-3.json',
+    'country_mapping.json',
+)
+
+
 def create_basename_by_name_super_index() -> Index:
     """Process ISO and synonyms database to have a basename by name index.
 
@@ -152,6 +182,40 @@ def create_basename_by_name_super_index() -> Index:
     return merged_index
 
 
+def create_basename_by_code_index() -> Index:
+    """Process ISO databases to have a basename by country code index.
+
+    The main countries are indexed by alpha-2, alpha-3 and numeric codes (e.g. **276**),
+    the former countries by alpha-3 and alpha-4 codes and the country regions by their codes
+    (e.g. **US-CA**) mapped to the main country. The main country codes take precedence over
+    the former country ones (e.g. **ATF**).
+
+    Returns:
+        combined country (main, region, former) index by codes
+
+    """
+    main_country_db = load_main_country_db()
+    country_region_db = load_country_region_db()
+    country_old_db = load_country_old_db()
+
+    main_country_name_by_a3_index = create_index(main_country_db, 'name', 'a3')
+    main_country_a3_by_code_index = create_index(main_country_db, 'a3', ['a2', 'a3', 'num'])
+    code_index = chain_indexes(main_country_a3_by_code_index, main_country_name_by_a3_index)
+
+    main_country_name_by_a2_index = create_index(main_country_db, 'name', 'a2')
+    country_region_base_by_code_index = {code: get_main_code(code) for code in country_region_db}
+    country_region_basename_by_code_index = chain_indexes(
+        country_region_base_by_code_index, main_country_name_by_a2_index
+    )
+
+    country_old_name_by_code_index = create_index(country_old_db, 'name', ['a3', 'a4'])
+
+    for index in (country_region_basename_by_code_index, country_old_name_by_code_index):
+        for code, name in index.items():
+            code_index.setdefault(code, name)
+    return code_index
+
+
 def load_post_process_country_mapping() -> StringMap:
     """Load post process index.
 
@@ -168,13 +232,25 @@ def load_post_process_country_mapping() -> StringMap:
 def save_index(index: Index, path: str) -> None:
     """Save index to a file.
 
+    The index is written to a temporary file which then replaces the ``path`` one,
+    so an interrupted write never leaves a partially written file.
+
     Args:
         index: dict index
         path: path to save index to
 
     """
-    with open(path, 'wt', encoding='utf-8') as f:
-        json.dump(index, f, ensure_ascii=False)
+    tmp_path = f'{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 def restore_index(path: str) -> Index:
@@ -0,0 +1,323 @@
+"""Hot path metrics of the country normalization.
+
+:py:class:`Metrics` counts how the names are resolved (the direct index, the country code
+index, the folded direct index, the prefilter, the search cache or fuzzy search) and collects
+latency histograms for every resolution path. The metrics can be exported as a dict or
+in the Prometheus text format.
+
+Usage example::
+
+    from dicountries.metrics import Metrics
+    from dicountries.whoosh_index import CountryIndex
+
+    country_index = CountryIndex(metrics=Metrics())
+    country_index.normalize_country('Russia')
+    country_index.normalize_country('Rusia')
+
+    print(country_index.metrics.to_dict()['counters'])
+    print(country_index.metrics.to_prometheus())
+
+"""
+
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Set
+
+#: The name is found in the direct index.
+EXACT = 'exact'
+
+#: The name is found in the country code index (ISO codes, e.g. **DE**, **DEU** or **276**).
+CODE = 'code'
+
+#: The name is found in the folded direct index (see :py:func:`dicountries.utils.fold_name`).
+FOLDED = 'folded'
+
+#: The name is found in the search cache.
+CACHE = 'cache'
+
+#: The name is found by fuzzy search.
+SEARCH = 'search'
+
+#: The name is rejected by the prefilter (see :py:mod:`dicountries.prefilter`).
+REJECTED = 'rejected'
+
+#: Fuzzy search has found nothing.
+MISS = 'miss'
+
+#: Resolution paths of the names in the order of their checking.
+PATHS = (EXACT, CODE, FOLDED, REJECTED, CACHE, SEARCH, MISS)
+
+#: Whoosh search with the terms combined by AND has found nothing and
+#: the terms are combined by OR.
+OR_FALLBACK = 'or_fallback'
+
+#: Whoosh search query is limited by the query budget or the search is stopped by the deadline
+#: (see :py:mod:`dicountries.query_budget`).
+DEGRADED = 'degraded'
+
+#: Default latency histogram buckets (upper bounds in seconds).
+DEFAULT_BUCKETS = (
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    2.5e-2,
+    5e-2,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+class Histogram:
+    """Histogram with fixed buckets.
+
+    Args:
+        buckets: sorted upper bounds of the buckets (the last bucket is unbounded)
+
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        #: sorted upper bounds of the buckets.
+        self.buckets = tuple(buckets)
+        #: number of values in every bucket (not cumulative), the last one is unbounded.
+        self.counts = [0] * (len(self.buckets) + 1)
+        #: sum of the values.
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of the values."""
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        """Add a value to the histogram.
+
+        Args:
+            value: value to add
+
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        """Get numbers of the values less or equal to every bucket bound.
+
+        Returns:
+            cumulative counts (the last one is the number of all values)
+
+        """
+        counts, total = [], 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class _Shard:
+    """Counters and histograms updated by one thread."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.counters = dict.fromkeys(PATHS + (OR_FALLBACK, DEGRADED), 0)
+        self.histograms = {path: Histogram(buckets) for path in PATHS}
+
+    def add(self, other: '_Shard') -> None:
+        """Add counters and histograms of another shard.
+
+        Args:
+            other: shard to add
+
+        """
+        for name, value in other.counters.items():
+            self.counters[name] += value
+        for path, histogram in other.histograms.items():
+            total_histogram = self.histograms[path]
+            for i, count in enumerate(histogram.counts):
+                total_histogram.counts[i] += count
+            total_histogram.sum += histogram.sum
+
+
+class _ShardOwner:
+    """Thread local holder of a shard, the shard is retired when the thread is finished
+    and the holder is collected.
+    """
+
+    __slots__ = ('shard', '__weakref__')
+
+    def __init__(self, shard: _Shard):
+        self.shard = shard
+
+
+def _retire_shard(metrics_ref: 'weakref.ref[Metrics]', shard: _Shard) -> None:
+    """Retire a shard of a finished thread (see :py:meth:`Metrics._retire`).
+
+    Args:
+        metrics_ref: weak reference to the metrics
+        shard: shard to retire
+
+    """
+    metrics = metrics_ref()
+    if metrics is not None:
+        metrics._retire(shard)  # pylint: disable=protected-access
+
+
+class Metrics:
+    """Counters and latency histograms of the country normalization.
+
+    The counters are numbers of the names resolved by every path (see :py:data:`PATHS`)
+    and the numbers of the AND to OR query fallbacks (:py:data:`OR_FALLBACK`) and of the
+    degraded searches (:py:data:`DEGRADED`).
+    The latency histograms are collected for every path by the single name normalization,
+    the batch normalization updates only the counters.
+
+    Every thread updates its own counters and histograms without locks, they are summed
+    on the export. The counters and histograms of the finished threads are merged
+    into the retained totals, so the memory doesn't grow with the number of threads.
+
+    Args:
+        buckets: latency histogram buckets (upper bounds in seconds)
+        prefix: name prefix of the exported Prometheus metrics
+
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = 'dicountries'):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: Set[_Shard] = set()
+        self._retired = _Shard(self.buckets)
+
+    def reset(self) -> None:
+        """Reset all counters and histograms."""
+        with self._lock:
+            local, self._local = self._local, threading.local()
+            self._shards = set()
+            self._retired = _Shard(self.buckets)
+        del local  # the shard holders are collected without the lock
+
+    def _get_shard(self) -> _Shard:
+        """Get counters and histograms of the current thread (create them if required).
+
+        Returns:
+            counters and histograms of the current thread
+
+        """
+        local = self._local
+        try:
+            return local.owner.shard
+        except AttributeError:
+            shard = _Shard(self.buckets)
+            local.owner = _ShardOwner(shard)
+            weakref.finalize(local.owner, _retire_shard, weakref.ref(self), shard)
+            with self._lock:
+                self._shards.add(shard)
+            return shard
+
+    def _retire(self, shard: _Shard) -> None:
+        """Merge counters and histograms of a finished thread into the retained totals.
+
+        Args:
+            shard: counters and histograms of the finished thread
+
+        """
+        with self._lock:
+            if shard in self._shards:  # not reset
+                self._shards.remove(shard)
+                self._retired.add(shard)
+
+    def inc(self, name: str, value: int = 1) -> None:
+        """Increase a counter.
+
+        Args:
+            name: counter name (one of :py:data:`PATHS`, :py:data:`OR_FALLBACK`
+                or :py:data:`DEGRADED`)
+            value: value to add
+
+        """
+        self._get_shard().counters[name] += value
+
+    def observe(self, path: str, seconds: float) -> None:
+        """Count a name resolved by the path and add its latency to the path histogram.
+
+        Args:
+            path: resolution path (one of :py:data:`PATHS`)
+            seconds: latency in seconds
+
+        """
+        histogram = self._get_shard().histograms[path]
+        histogram.counts[bisect_left(histogram.buckets, seconds)] += 1
+        histogram.sum += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the metrics as a dict.
+
+        Returns:
+            the counters by names (**counters**) and the latency histograms by paths
+            (**latency**) with the bucket bounds, cumulative counts, sum and count
+
+        """
+        total = _Shard(self.buckets)
+        with self._lock:
+            shards = list(self._shards)
+            total.add(self._retired)
+        for shard in shards:
+            total.add(shard)
+
+        latency = {}
+        for path, histogram in total.histograms.items():
+            total.counters[path] += histogram.count
+            latency[path] = dict(
+                buckets=list(histogram.buckets),
+                counts=histogram.cumulative_counts(),
+                sum=histogram.sum,
+                count=histogram.count,
+            )
+        return dict(counters=total.counters, latency=latency)
+
+    def to_prometheus(self) -> str:
+        """Export the metrics in the Prometheus text format.
+
+        Returns:
+            **<prefix>_lookups_total** counter and **<prefix>_lookup_seconds** histogram
+            labeled by the paths, **<prefix>_or_fallbacks_total** and
+            **<prefix>_degraded_searches_total** counters
+
+        """
+        data = self.to_dict()
+        lookups, seconds = f'{self.prefix}_lookups_total', f'{self.prefix}_lookup_seconds'
+        fallbacks = f'{self.prefix}_or_fallbacks_total'
+        degraded = f'{self.prefix}_degraded_searches_total'
+        lines = [
+            f'# HELP {lookups} Country names resolved by every path.',
+            f'# TYPE {lookups} counter',
+        ]
+        lines += [f'{lookups}{{path="{path}"}} {data["counters"][path]}' for path in PATHS]
+        lines += [
+            f'# HELP {fallbacks} Fuzzy searches retried with the terms combined by OR.',
+            f'# TYPE {fallbacks} counter',
+            f'{fallbacks} {data["counters"][OR_FALLBACK]}',
+            f'# HELP {degraded} Fuzzy searches limited by the query budget or the deadline.',
+            f'# TYPE {degraded} counter',
+            f'{degraded} {data["counters"][DEGRADED]}',
+            f'# HELP {seconds} Country name normalization latency by resolution path.',
+            f'# TYPE {seconds} histogram',
+        ]
+        for path, histogram in data['latency'].items():
+            bounds = [repr(bound) for bound in histogram['buckets']] + ['+Inf']
+            for bound, count in zip(bounds, histogram['counts']):
+                lines.append(f'{seconds}_bucket{{path="{path}",le="{bound}"}} {count}')
+            lines.append(f'{seconds}_sum{{path="{path}"}} {histogram["sum"]!r}')
+            lines.append(f'{seconds}_count{{path="{path}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
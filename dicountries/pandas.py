@@ -0,0 +1,125 @@
+"""Vectorized country name normalization of pandas series.
+
+Country columns usually have a lot of rows but only a few distinct values, so the column is
+factorized, only the unique values are normalized and the results are broadcast back to
+the rows with :py:meth:`numpy.ndarray.take`. Missing values stay missing.
+
+Requires the ``pandas`` extra::
+
+    % python -m pip install -U dicountries[pandas]
+
+Usage example::
+
+    import pandas as pd
+
+    import dicountries.pandas  # registers the ``countries`` series accessor
+    from dicountries.whoosh_index import CountryIndex
+
+    country_index = CountryIndex()
+    df = pd.DataFrame(dict(country=['Russia', 'Rusia', None, 'Russia']))
+
+    df['normalized'] = df['country'].countries.normalize(country_index)
+    df['refined'] = dicountries.pandas.normalize_series(df['country'], country_index, refine=True)
+
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        'pandas and numpy are required by dicountries.pandas, '
+        'install them with `python -m pip install -U dicountries[pandas]`'
+    ) from e
+
+from .whoosh_index import CountryIndex
+
+
+@lru_cache(maxsize=None)
+def get_default_index() -> CountryIndex:
+    """Get the country index used if no index is passed (created on the first call).
+
+    Returns:
+        country index with the default arguments
+
+    """
+    return CountryIndex()
+
+
+def normalize_series(
+    series: pd.Series,
+    country_index: Optional[CountryIndex] = None,
+    postprocess: bool = True,
+    refine: bool = False,
+) -> pd.Series:
+    """Normalize country names of a pandas series.
+
+    Every distinct value is normalized only once with
+    :py:meth:`dicountries.whoosh_index.CountryIndex.normalize_countries`
+    (or :py:meth:`dicountries.whoosh_index.CountryIndex.refine_countries` if ``refine``
+    is True). Values which are not strings are converted to strings, missing values are
+    kept as is.
+
+    Args:
+        series: series with country names
+        country_index: country index to use (see :py:func:`get_default_index` if None)
+        postprocess: flag showing if postprocessing should be applied (ignored if ``refine``)
+        refine: flag showing if the names should be refined
+
+    Returns:
+        series with normalized names with the same index and name as ``series``
+
+    """
+    country_index = country_index or get_default_index()
+    codes, uniques = pd.factorize(series)
+    names = [str(value) for value in uniques]
+    if refine:
+        normalized = country_index.refine_countries(names)
+    else:
+        normalized = country_index.normalize_countries(names, postprocess)
+    # the last item is taken for the missing values (code -1)
+    values = np.array(normalized + [np.nan], dtype=object)
+    return pd.Series(values.take(codes), index=series.index, name=series.name)
+
+
+@pd.api.extensions.register_series_accessor('countries')
+class CountriesAccessor:
+    """Pandas series accessor available as ``series.countries``.
+
+    Args:
+        series: series with country names
+
+    """
+
+    def __init__(self, series: pd.Series):
+        self._series = series
+
+    def normalize(
+        self, country_index: Optional[CountryIndex] = None, postprocess: bool = True
+    ) -> pd.Series:
+        """Normalize country names (see :py:func:`normalize_series`).
+
+        Args:
+            country_index: country index to use (see :py:func:`get_default_index` if None)
+            postprocess: flag showing if postprocessing should be applied
+
+        Returns:
+            series with normalized names
+
+        """
+        return normalize_series(self._series, country_index, postprocess=postprocess)
+
+    def refine(self, country_index: Optional[CountryIndex] = None) -> pd.Series:
+        """Normalize and refine country names (see :py:func:`normalize_series`).
+
+        Args:
+            country_index: country index to use (see :py:func:`get_default_index` if None)
+
+        Returns:
+            series with refined names
+
+        """
+        return normalize_series(self._series, country_index, refine=True)
@@ -0,0 +1,171 @@
+"""Parallel country name normalization using a process pool.
+
+The country index is built (or restored) only once. On Linux worker processes inherit
+the index from the parent process by forking if the parent has no other threads
+(see :py:func:`can_fork`). Otherwise workers restore the index from the on disk backup
+and the super index snapshot saved by the parent index, so nothing is rebuilt from
+the json databases.
+
+Usage example::
+
+    from dicountries.parallel import normalize_countries
+
+    print(normalize_countries(['Russia', 'Rusia', 'Untied Kingdom'], max_workers=4))
+
+"""
+
+import math
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, cast
+
+from .whoosh_index import CountryIndex
+
+#: Min number of names sent to a worker process at once.
+MIN_SHARD_SIZE = 64
+
+_worker_index: Optional[CountryIndex] = None
+
+
+def _init_worker(country_index: Optional[CountryIndex], index_kwargs: Dict[str, Any]) -> None:
+    """Initialize country index in a worker process.
+
+    Args:
+        country_index: index inherited from the parent process (``fork`` start method only)
+        index_kwargs: :py:class:`dicountries.whoosh_index.CountryIndex` arguments to restore
+            the index if it is not inherited
+
+    """
+    global _worker_index  # pylint: disable=global-statement
+    _worker_index = country_index or CountryIndex(**index_kwargs)
+
+
+def _normalize_shard(names: List[str], postprocess: bool) -> List[str]:
+    """Normalize names in a worker process.
+
+    Args:
+        names: names to normalize
+        postprocess: flag showing if postprocessing should be applied
+
+    Returns:
+        normalized names
+
+    """
+    return cast(CountryIndex, _worker_index).normalize_countries(names, postprocess)
+
+
+def get_index_kwargs(country_index: CountryIndex) -> Dict[str, Any]:
+    """Get arguments to create a copy of the country index in another process.
+
+    Args:
+        country_index: country index
+
+    Returns:
+        :py:class:`dicountries.whoosh_index.CountryIndex` constructor arguments
+
+    """
+    return dict(
+        index_path=country_index.path,
+        post_process_country_map=dict(country_index.post_process_country_map),
+        max_search_cache=country_index.max_search_cache,
+        search_cache_ttl=country_index.search_cache.ttl,
+        use_snapshot=country_index.use_snapshot,
+        engine=country_index.engine,
+        scorer=country_index.scorer,
+        use_mmap=country_index.use_mmap,
+        prefilter=country_index.prefilter,
+        query_budget=country_index.query_budget,
+    )
+
+
+def can_fork(country_index: CountryIndex) -> bool:
+    """Check if the worker processes can inherit the country index by forking.
+
+    A forked child gets only the forking thread, so a lock held by another thread
+    at the moment of the fork (e.g. the search cache or the metrics lock) stays locked
+    in the child forever. Forking is used only on Linux (it is unsafe on macOS)
+    and only if the process has no other threads and the index has no executor.
+
+    Args:
+        country_index: country index
+
+    Returns:
+        True if the ``fork`` start method should be used
+
+    """
+    if not sys.platform.startswith('linux') or country_index.executor is not None:
+        return False
+    return 'fork' in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def normalize_countries(  # pylint: disable=too-many-arguments
+    names: Iterable[str],
+    country_index: Optional[CountryIndex] = None,
+    postprocess: bool = True,
+    max_workers: Optional[int] = None,
+    shards_per_worker: int = 4,
+    **index_kwargs: Any,
+) -> List[str]:
+    """Normalize country names using several processes.
+
+    Unique names are split to shards, the shards are normalized by worker processes
+    with :py:meth:`dicountries.whoosh_index.CountryIndex.normalize_countries` and
+    the results are merged back in the order of ``names``.
+    The workers inherit the index only if the process has no other threads, so the workers
+    of a multithreaded process (e.g. with ``use_async`` indexes) restore the index
+    from the backup (see :py:func:`can_fork`).
+
+    Args:
+        names: names to normalize
+        country_index: country index to use (a new one is created with ``index_kwargs`` if None)
+        postprocess: flag showing if postprocessing should be applied
+        max_workers: number of worker processes (the number of CPUs if None)
+        shards_per_worker: number of shards sent to every worker
+            (more shards give better balancing of the workers)
+        index_kwargs: :py:class:`dicountries.whoosh_index.CountryIndex` constructor arguments
+            if ``country_index`` is None
+
+    Returns:
+        normalized and possibly postprocessed country names in the order of ``names``
+
+    """
+    names = [name.strip() for name in names]
+    unique_names = list(dict.fromkeys(names))
+    if country_index is None:
+        country_index = CountryIndex(**index_kwargs)
+    max_workers = max_workers or os.cpu_count() or 1
+    shard_size = max(
+        math.ceil(len(unique_names) / (max_workers * shards_per_worker)), MIN_SHARD_SIZE
+    )
+    shards = [
+        unique_names[i : i + shard_size] for i in range(0, len(unique_names), shard_size)
+    ]
+
+    if max_workers == 1 or len(shards) <= 1:
+        results = country_index.normalize_countries(unique_names, postprocess)
+    else:
+        if can_fork(country_index):
+            mp_context = multiprocessing.get_context('fork')
+            initargs = (country_index, {})
+        else:
+            mp_context = multiprocessing.get_context()
+            initargs = (None, get_index_kwargs(country_index))
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(shards)),
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=initargs,
+        ) as executor:
+            results = [
+                name
+                for shard_results in executor.map(
+                    _normalize_shard, shards, [postprocess] * len(shards)
+                )
+                for name in shard_results
+            ]
+
+    normalized = dict(zip(unique_names, results))
+    return [normalized[name] for name in names]
@@ -0,0 +1,158 @@
+"""Cheap checks rejecting names which can't be found by fuzzy search.
+
+Empty strings, numeric identifiers, e-mail addresses, URLs and long free text values
+are rejected by the length bounds and the character class checks. Names which have
+almost no trigrams of the indexed vocabulary (e.g. **xxxxqq**) are rejected too.
+The rejected names are not searched and not cached, they are returned as is
+(the same as the names that fuzzy search has found nothing for).
+
+Usage example::
+
+    from dicountries.prefilter import Prefilter
+    from dicountries.whoosh_index import CountryIndex
+
+    country_index = CountryIndex(prefilter=Prefilter(max_length=100))
+    print(country_index.normalize_country('john@example.com'))
+
+"""
+
+import re
+from typing import FrozenSet, Iterable, Optional, Pattern, Set
+
+from .utils import fold_name
+
+#: Pattern of the values which are not names (e-mail addresses and URLs).
+DEFAULT_REJECT_PATTERN = re.compile(r'@|://|^www\.', re.IGNORECASE)
+
+#: Pattern of letters.
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+#: Pattern of digits.
+DIGIT_PATTERN = re.compile(r'\d')
+
+
+def get_trigrams(name: str) -> Set[str]:
+    """Get trigrams of the folded name words (see :py:func:`dicountries.utils.fold_name`).
+
+    Every word is padded with spaces, so the words shorter than 3 letters have
+    trigrams too.
+
+    Args:
+        name: name to split
+
+    Returns:
+        trigrams of the name
+
+    """
+    trigrams = set()
+    for word in fold_name(name).split():
+        padded = f' {word} '
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class Prefilter:
+    """Checks rejecting hopeless names before fuzzy search.
+
+    The vocabulary trigrams are set by :py:meth:`fit`, the trigram check is skipped
+    until then.
+
+    Args:
+        min_length: min length of the stripped name
+        max_length: max length of the stripped name
+        max_digit_ratio: max ratio of digits to the name length
+        min_trigram_ratio: min ratio of the name trigrams present in the indexed vocabulary
+        reject_pattern: pattern of the rejected values (e-mail addresses and URLs by default)
+        trigrams: trigrams of the indexed vocabulary (see :py:func:`get_trigrams`)
+
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        min_length: int = 2,
+        max_length: int = 200,
+        max_digit_ratio: float = 0.5,
+        min_trigram_ratio: float = 0.2,
+        reject_pattern: Optional[Pattern[str]] = DEFAULT_REJECT_PATTERN,
+        trigrams: Optional[FrozenSet[str]] = None,
+    ):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.max_digit_ratio = max_digit_ratio
+        self.min_trigram_ratio = min_trigram_ratio
+        self.reject_pattern = reject_pattern
+        self.trigrams = trigrams
+
+    def fit(self, names: Iterable[str]) -> 'Prefilter':
+        """Create a prefilter with the same settings and the trigrams of the vocabulary.
+
+        Args:
+            names: indexed names
+
+        Returns:
+            new prefilter
+
+        """
+        trigrams: Set[str] = set()
+        for name in names:
+            trigrams.update(get_trigrams(name))
+        return Prefilter(
+            self.min_length,
+            self.max_length,
+            self.max_digit_ratio,
+            self.min_trigram_ratio,
+            self.reject_pattern,
+            frozenset(trigrams),
+        )
+
+    def extend(self, names: Iterable[str]) -> 'Prefilter':
+        """Create a prefilter with the same settings and the trigrams of the added names.
+
+        The trigrams of the removed names are kept, they only make the prefilter
+        a bit less strict until the next :py:meth:`fit`.
+
+        Args:
+            names: added names
+
+        Returns:
+            new prefilter (or this prefilter if it is not fitted)
+
+        """
+        if self.trigrams is None:
+            return self
+        trigrams = set(self.trigrams)
+        for name in names:
+            trigrams.update(get_trigrams(name))
+        return Prefilter(
+            self.min_length,
+            self.max_length,
+            self.max_digit_ratio,
+            self.min_trigram_ratio,
+            self.reject_pattern,
+            frozenset(trigrams),
+        )
+
+    def accepts(self, name: str) -> bool:
+        """Check if the name can be found by fuzzy search.
+
+        Args:
+            name: stripped name
+
+        Returns:
+            False if the name is hopeless and should not be searched
+
+        """
+        if not self.min_length <= len(name) <= self.max_length:
+            return False
+        if not LETTER_PATTERN.search(name):
+            return False
+        if len(DIGIT_PATTERN.findall(name)) > self.max_digit_ratio * len(name):
+            return False
+        if self.reject_pattern is not None and self.reject_pattern.search(name):
+            return False
+        if self.trigrams is not None:
+            trigrams = get_trigrams(name)
+            if trigrams:
+                present = sum(1 for trigram in trigrams if trigram in self.trigrams)
+                return present >= self.min_trigram_ratio * len(trigrams)
+        return True
@@ -0,0 +1,201 @@
+"""Cost limits of the whoosh fuzzy search queries.
+
+Every query term gets a fuzzy automaton (up to 3 edits for the long terms, see
+:py:func:`dicountries.fuzzy_index.get_max_edits`) and all terms are combined by AND
+and then by OR, so garbage names with many long tokens can be searched far longer
+than the real country names. A :py:class:`QueryBudget` limits:
+
+* the number of the query terms (only the longest terms are kept);
+* the sum of the term edit distances (the largest distances are decreased first);
+* the search duration (the fuzzy terms expansion is stopped by the deadline
+  and the documents found before the deadline are rated).
+
+Usage example::
+
+    from dicountries.query_budget import QueryBudget
+    from dicountries.whoosh_index import CountryIndex
+
+    country_index = CountryIndex(query_budget=QueryBudget(max_tokens=8, deadline=0.1))
+    print(country_index.normalize_country_detailed('Rusia ' * 100))
+
+"""
+
+import copy
+import time
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from whoosh.collectors import Collector, TimeLimit, WrappingCollector
+from whoosh.query import FuzzyTerm, NullQuery, Query
+from whoosh.reading import IndexReader, SegmentReader
+from whoosh.searching import Results, Searcher
+
+
+class _DeadlineCursor:
+    """Field cursor raising :py:class:`whoosh.collectors.TimeLimit` after the deadline.
+
+    Args:
+        cursor: wrapped whoosh field cursor
+        deadline: :py:func:`time.perf_counter` value to stop at
+
+    """
+
+    def __init__(self, cursor: Any, deadline: float):
+        self._cursor = cursor
+        self._deadline = deadline
+
+    def find(self, string: str) -> None:
+        if time.perf_counter() > self._deadline:
+            raise TimeLimit
+        self._cursor.find(string)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class DeadlineFuzzyTerm(FuzzyTerm):
+    """Fuzzy term which expansion raises :py:class:`whoosh.collectors.TimeLimit`
+    after the :py:attr:`deadline`.
+
+    The expansion of a long term with several edits walks a large part of the term
+    dictionary (it can take a second), so the deadline is checked on every step of the walk.
+    """
+
+    #: :py:func:`time.perf_counter` value to stop the expansion at or None if there is no limit.
+    deadline: Optional[float] = None
+
+    def _btexts(self, ixreader: IndexReader) -> Iterator[str]:
+        if self.deadline is None or not isinstance(ixreader, SegmentReader):
+            return super()._btexts(ixreader)
+        fieldobj = ixreader.schema[self.fieldname]
+        cursor = ixreader.cursor(fieldobj.spelling_fieldname(self.fieldname))
+        automata = ixreader.codec().automata(ixreader.storage(), ixreader.segment())
+        dfa = automata.levenshtein_dfa(self.text, self.maxdist, self.prefixlength)
+        return automata.find_matches(dfa, _DeadlineCursor(cursor, self.deadline))
+
+
+class QueryBudget(NamedTuple):
+    """Cost limits of one fuzzy search (None disables a limit)."""
+
+    #: max number of the query terms.
+    max_tokens: Optional[int] = 16
+
+    #: max sum of the edit distances of the fuzzy query terms (the expansion cost of a term
+    #: grows about 5 times with every edit).
+    max_edits: Optional[int] = 8
+
+    #: max duration of the search in seconds.
+    deadline: Optional[float] = None
+
+    def get_deadline(self) -> Optional[float]:
+        """Get the deadline of a search starting now.
+
+        Returns:
+            :py:func:`time.perf_counter` value to stop the search at or None if there is no limit
+
+        """
+        return None if self.deadline is None else time.perf_counter() + self.deadline
+
+    def limit_query(self, query: Query, deadline: Optional[float] = None) -> Tuple[Query, bool]:
+        """Drop the shortest terms and decrease the edit distances of the query
+        to fit the :py:attr:`max_tokens` and :py:attr:`max_edits` limits.
+
+        Args:
+            query: parsed query
+            deadline: :py:func:`time.perf_counter` value to stop the expansion
+                of the :py:class:`DeadlineFuzzyTerm` terms at
+
+        Returns:
+            limited query and True if the terms or their edit distances were changed
+
+        """
+        leaves = list(query.leaves())
+        kept = leaves
+        if self.max_tokens is not None and len(leaves) > self.max_tokens:
+            by_length = sorted(leaves, key=lambda leaf: -len(getattr(leaf, 'text', '') or ''))
+            kept = by_length[: self.max_tokens]
+        kept_ids = {id(leaf) for leaf in kept}
+
+        fuzzy = [leaf for leaf in kept if isinstance(leaf, FuzzyTerm)]
+        edits: Dict[int, int] = {id(leaf): leaf.maxdist for leaf in fuzzy}
+        if self.max_edits is not None:
+            total = sum(edits.values())
+            while total > self.max_edits:
+                widest = max(fuzzy, key=lambda leaf: (edits[id(leaf)], len(leaf.text)))
+                edits[id(widest)] -= 1
+                total -= 1
+
+        limited = len(kept) < len(leaves)
+        limited = limited or any(leaf.maxdist != edits[id(leaf)] for leaf in fuzzy)
+        timed = deadline is not None and any(isinstance(q, DeadlineFuzzyTerm) for q in fuzzy)
+        if not limited and not timed:
+            return query, False
+
+        def limit_leaf(q: Query) -> Query:
+            if not q.is_leaf():
+                return q
+            if id(q) not in kept_ids:
+                return NullQuery
+            if id(q) in edits:
+                maxdist = edits[id(q)]
+                q = copy.copy(q)
+                q.maxdist = maxdist
+                if isinstance(q, DeadlineFuzzyTerm):
+                    q.deadline = deadline
+            return q
+
+        return query.accept(limit_leaf).normalize(), limited
+
+
+class DeadlineCollector(WrappingCollector):
+    """Collector raising :py:class:`whoosh.collectors.TimeLimit` after the deadline.
+
+    Unlike :py:class:`whoosh.collectors.TimeLimitCollector` it doesn't start a timer
+    thread or use signals (so it can be used in any thread), the time is checked before
+    every collected document.
+
+    Args:
+        child: wrapped collector
+        deadline: :py:func:`time.perf_counter` value to stop at
+
+    """
+
+    def __init__(self, child: Collector, deadline: float):
+        super().__init__(child)
+        self.deadline = deadline
+
+    def collect_matches(self) -> None:
+        child, deadline = self.child, self.deadline
+        for sub_docnum in child.matches():
+            if time.perf_counter() > deadline:
+                raise TimeLimit
+            child.collect(sub_docnum)
+
+
+def search_until(
+    searcher: Searcher, query: Query, deadline: Optional[float]
+) -> Tuple[Results, bool]:
+    """Search all documents matching the query until the deadline.
+
+    Args:
+        searcher: opened whoosh searcher
+        query: query to search
+        deadline: :py:func:`time.perf_counter` value to stop at or None to search all documents
+
+    Returns:
+        found documents (the documents found before the deadline)
+        and True if the deadline was reached
+
+    """
+    if deadline is None:
+        return searcher.search(query, limit=None), False
+    collector = DeadlineCollector(searcher.collector(limit=None), deadline)
+    try:
+        searcher.search_with_collector(query, collector)
+    except TimeLimit:
+        return collector.results(), True
+    return collector.results(), False
+
+
+#: Default query budget, it limits only the pathological queries (the longest indexed names
+#: have 15 terms and the real names rarely need more than 8 edits).
+DEFAULT_QUERY_BUDGET = QueryBudget()
@@ -0,0 +1,131 @@
+"""Search result scorers used to rate names found by fuzzy search.
+
+A scorer compares one query with many candidates at once, so large candidate sets
+(e.g. thousands of names found by a generic query like **Republic**) are scored
+without per candidate python overhead (if rapidfuzz is installed). The best candidates
+are selected with :py:func:`top_k` which uses numpy if it is installed.
+
+Usage example::
+
+    from dicountries.scorers import TokenSortScorer, top_k
+
+    scores = TokenSortScorer().score('korea republic', ['korea republic', 'korea north'])
+    print(scores, top_k(scores, 1))
+
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+try:
+    from Levenshtein import ratio
+except ImportError:  # pragma: no cover
+    from difflib import SequenceMatcher
+
+    def ratio(s1: str, s2: str) -> float:
+        """Fallback similarity ratio (the same as fuzzywuzzy uses without python-Levenshtein).
+
+        Args:
+            s1: first string
+            s2: second string
+
+        Returns:
+            similarity ratio in the range [0, 1]
+
+        """
+        return SequenceMatcher(None, s1, s2).ratio()
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    from rapidfuzz.distance import Indel
+    from rapidfuzz.process import cdist
+except ImportError:  # pragma: no cover
+    cdist = None
+
+#: Min number of scores selected with numpy by :py:func:`top_k` (heapq is faster for less).
+NUMPY_MIN_SIZE = 256
+
+#: Min number of candidates scored with rapidfuzz by :py:class:`TokenSortScorer`
+#: (the per candidate ratio calculation is faster for less).
+CDIST_MIN_SIZE = 32
+
+
+class Scorer(ABC):
+    """Base class of the search result scorers.
+
+    Scorers compare sort forms of the names
+    (see :py:func:`dicountries.fuzzy_index.get_sort_form`), which are calculated for
+    the indexed names once on indexing.
+
+    """
+
+    @abstractmethod
+    def score(self, query: str, candidates: Sequence[str]) -> List[int]:
+        """Score candidates comparing them with the query.
+
+        Args:
+            query: sort form of the searched name
+            candidates: sort forms of the found names
+
+        Returns:
+            scores in the range [0, 100] in the order of ``candidates``
+
+        """
+
+
+class TokenSortScorer(Scorer):
+    """Default scorer giving the same scores as :py:func:`fuzzywuzzy.fuzz.token_sort_ratio`.
+
+    The :py:func:`fuzzywuzzy.fuzz.ratio` of the sort forms is calculated without
+    the fuzzywuzzy argument checks and preprocessing (an empty name always scores 0,
+    it matches nothing). If rapidfuzz and numpy are installed, the edit distances of many
+    candidates are calculated by one :py:func:`rapidfuzz.process.cdist` call and the ratios
+    are calculated by numpy.
+
+    """
+
+    def score(self, query: str, candidates: Sequence[str]) -> List[int]:
+        if not query:
+            return [0] * len(candidates)
+        if cdist is None or np is None or len(candidates) < CDIST_MIN_SIZE:
+            return [int(round(100 * ratio(query, candidate))) for candidate in candidates]
+        distances = cdist([query], candidates, scorer=Indel.distance, dtype=np.int32)[0]
+        lengths = np.fromiter(map(len, candidates), np.int64, len(candidates)) + len(query)
+        return np.round(100 * ((lengths - distances) / lengths)).astype(int).tolist()
+
+
+def top_k(scores: Sequence[int], limit: Optional[int] = None) -> List[int]:
+    """Select positions of the best scores.
+
+    The result order is the same as a stable sort of all scores in descending order gives
+    (positions of equal scores are in ascending order), but only ``limit`` scores are sorted.
+
+    Args:
+        scores: scores to select
+        limit: number of positions to select (all positions if None or 0)
+
+    Returns:
+        positions of the best scores in descending score order
+
+    """
+    size = len(scores)
+    if not limit or limit >= size:
+        return sorted(range(size), key=lambda i: -scores[i])
+    if np is None or size < NUMPY_MIN_SIZE:
+        return heapq.nsmallest(limit, range(size), key=lambda i: (-scores[i], i))
+    values = np.asarray(scores)
+    threshold = np.partition(values, size - limit)[size - limit]
+    better = np.flatnonzero(values > threshold)
+    equal = np.flatnonzero(values == threshold)[: limit - len(better)]
+    selected = np.concatenate((better, equal))
+    return selected[np.lexsort((selected, -values[selected]))].tolist()
+
+
+#: Scorer used if no scorer is passed.
+DEFAULT_SCORER = TokenSortScorer()
@@ -0,0 +1,124 @@
+"""Binary snapshots of the country super index.
+
+The super index (see :py:func:`dicountries.loader.create_basename_by_name_super_index`)
+is built from several json databases. A snapshot saves the final merged index in a
+binary file that is loaded with a single read. The snapshot is keyed by a hash of the
+data files, so a snapshot created by another package version is never used.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import pickle  # nosec
+import uuid
+from typing import Optional
+
+from .base_types import Index
+from .loader import SUPER_INDEX_DATA_FILES, create_basename_by_name_super_index, get_raw_data
+
+logger = logging.getLogger('dicountries')
+
+SNAPSHOT_VER = 1  # change this if you've changed the snapshot format
+
+SNAPSHOT_MAGIC = b'DICOUNTRIES-SNAPSHOT'
+
+
+@functools.lru_cache(maxsize=None)
+def get_data_hash() -> str:
+    """Get a hash of the data files used to create the super index.
+
+    Returns:
+        hex digest of the data files content and the snapshot format version
+
+    """
+    data_hash = hashlib.sha256(f'{SNAPSHOT_VER}'.encode('ascii'))
+    for file_name in SUPER_INDEX_DATA_FILES:
+        data_hash.update(file_name.encode('utf-8'))
+        data_hash.update(get_raw_data(file_name))
+    return data_hash.hexdigest()
+
+
+def _get_header(data_hash: str) -> bytes:
+    return b'%s %d %s\n' % (SNAPSHOT_MAGIC, SNAPSHOT_VER, data_hash.encode('ascii'))
+
+
+def save_super_index_snapshot(index: Index, path: str, data_hash: Optional[str] = None) -> None:
+    """Save the super index snapshot to a file.
+
+    The file is written to a temporary file (unique for every writer) and flushed to disk
+    first and then renamed, so concurrent readers never see a partially written snapshot
+    even after a crash.
+
+    Args:
+        index: super index to save
+        path: snapshot file path
+        data_hash: data hash to save with the snapshot (the current one if None)
+
+    """
+    header = _get_header(data_hash or get_data_hash())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            pickle.dump(dict(index), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_super_index_snapshot(path: str, data_hash: Optional[str] = None) -> Optional[Index]:
+    """Load the super index snapshot from a file.
+
+    Args:
+        path: snapshot file path
+        data_hash: expected data hash (the current one if None)
+
+    Returns:
+        super index or None if there is no snapshot or the snapshot is outdated or broken
+
+    """
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+    header_end = content.find(b'\n') + 1
+    if content[:header_end] != _get_header(data_hash or get_data_hash()):
+        logger.info('* Outdated countries snapshot %s', path)
+        return None
+    try:
+        return pickle.loads(memoryview(content)[header_end:])  # nosec
+    except (pickle.UnpicklingError, EOFError, ValueError) as e:
+        logger.warning('Broken countries snapshot %s: %s', path, e)
+        return None
+
+
+def load_basename_by_name_super_index(snapshot_path: Optional[str] = None) -> Index:
+    """Load the super index from a snapshot or create it if the snapshot can't be used.
+
+    Args:
+        snapshot_path: snapshot file path (the super index is always created if None).
+            A new snapshot is saved if the existing one is missed or outdated
+
+    Returns:
+        combined country (main, region, former), synonym index
+
+    """
+    if not snapshot_path:
+        return create_basename_by_name_super_index()
+    index = load_super_index_snapshot(snapshot_path)
+    if index is None:
+        index = create_basename_by_name_super_index()
+        try:
+            save_super_index_snapshot(index, snapshot_path)
+        except OSError as e:
+            logger.warning('Can not save countries snapshot %s: %s', snapshot_path, e)
+    return index
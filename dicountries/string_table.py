@@ -0,0 +1,260 @@
+"""Read-only memory mapped string tables shared by processes.
+
+A string table file keeps one or several string to string mappings (e.g. the direct search
+index of the country names). Every mapping is stored as:
+
+* UTF-8 encoded keys sorted in binary order and their offsets;
+* ids of the values for every key, UTF-8 encoded unique values and their offsets;
+* open addressing hash table of the key ids (crc32 of the encoded key, linear probing).
+
+The file is memory mapped and the lookups read the mapped arrays directly, so the processes
+attached to the same file share one copy of the data and attaching takes milliseconds
+(no python objects are created for the keys).
+
+Usage example::
+
+    from dicountries.string_table import load_string_tables, save_string_tables
+
+    save_string_tables('countries.table', dict(exact={'Russia': 'Russia'}), key='v1')
+    tables = load_string_tables('countries.table', key='v1')
+    print(tables['exact'].get('Russia'))
+
+"""
+
+import json
+import logging
+import mmap
+import os
+import sys
+import uuid
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger('dicountries')
+
+TABLE_VER = 1  # change this if you've changed the table format
+
+TABLE_MAGIC = b'DICOUNTRIES-TABLE'
+
+#: Array type code of the offsets, ids and hash slots (4 bytes unsigned integers).
+ITEM_TYPE = 'I'
+
+#: Min number of the hash table slots.
+MIN_SLOTS = 8
+
+
+class StringTable(Mapping[str, str]):
+    """Read-only string to string mapping over the memory mapped table
+    (see :py:func:`load_string_tables`).
+
+    Args:
+        buffer: buffer with the table file content
+        offset: table start offset in the buffer
+        size: number of keys
+        value_count: number of unique values
+        slot_count: number of hash table slots (power of 2)
+
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, buffer: memoryview, offset: int, size: int, value_count: int, slot_count: int
+    ):
+        self._size = size
+        counts = (size + 1, size, value_count + 1, slot_count)
+        arrays = []
+        for count in counts:
+            arrays.append(buffer[offset : offset + 4 * count].cast(ITEM_TYPE))
+            offset += 4 * count
+        self._key_offsets, self._value_ids, self._value_offsets, self._slots = arrays
+        self._keys = buffer[offset : offset + self._key_offsets[size]]
+        offset += self._key_offsets[size]
+        self._value_data = buffer[offset : offset + self._value_offsets[value_count]]
+        if offset + self._value_offsets[value_count] > len(buffer):
+            raise ValueError('Truncated string table')
+        #: decoded values by ids (there are only a few unique values).
+        self._values: List[Optional[str]] = [None] * value_count
+
+    def _find(self, key: str) -> int:
+        """Find id of the key.
+
+        Args:
+            key: key to find
+
+        Returns:
+            key id or -1 if there is no such key
+
+        """
+        try:
+            encoded = key.encode('utf-8')
+        except UnicodeEncodeError:
+            return -1
+        mask = len(self._slots) - 1
+        slot = zlib.crc32(encoded) & mask
+        for _ in range(len(self._slots)):  # a broken table can have no empty slot
+            key_id = self._slots[slot] - 1
+            if key_id < 0:
+                return -1
+            if self._keys[self._key_offsets[key_id] : self._key_offsets[key_id + 1]] == encoded:
+                return key_id
+            slot = (slot + 1) & mask
+        return -1
+
+    def _get_value(self, key_id: int) -> str:
+        value_id = self._value_ids[key_id]
+        value = self._values[value_id]
+        if value is None:
+            start, end = self._value_offsets[value_id], self._value_offsets[value_id + 1]
+            value = self._values[value_id] = str(self._value_data[start:end], 'utf-8')
+        return value
+
+    def __getitem__(self, key: str) -> str:
+        key_id = self._find(key) if isinstance(key, str) else -1
+        if key_id < 0:
+            raise KeyError(key)
+        return self._get_value(key_id)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        key_id = self._find(key) if isinstance(key, str) else -1
+        return default if key_id < 0 else self._get_value(key_id)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for key_id in range(self._size):
+            start, end = self._key_offsets[key_id], self._key_offsets[key_id + 1]
+            yield str(self._keys[start:end], 'utf-8')
+
+
+def _get_header(key: str) -> bytes:
+    return b'%s %d %s %s\n' % (
+        TABLE_MAGIC,
+        TABLE_VER,
+        sys.byteorder.encode('ascii'),
+        key.encode('utf-8'),
+    )
+
+
+def _pack_table(index: Mapping[str, str]) -> Tuple[Dict[str, int], bytes]:
+    """Pack a mapping to the table format.
+
+    Args:
+        index: mapping to pack
+
+    Returns:
+        table description (counts of the keys, values and hash slots) and packed table
+
+    """
+    items = sorted((k.encode('utf-8'), v) for k, v in index.items())
+    values = sorted(set(index.values()))
+    value_ids = {value: i for i, value in enumerate(values)}
+    slot_count = MIN_SLOTS
+    while slot_count < 2 * len(items):
+        slot_count *= 2
+
+    key_offsets, ids, slots = array(ITEM_TYPE, [0]), array(ITEM_TYPE), array(ITEM_TYPE)
+    slots.extend([0] * slot_count)
+    for key_id, (key, value) in enumerate(items):
+        key_offsets.append(key_offsets[-1] + len(key))
+        ids.append(value_ids[value])
+        slot = zlib.crc32(key) & (slot_count - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = key_id + 1
+    encoded_values = [value.encode('utf-8') for value in values]
+    value_offsets = array(ITEM_TYPE, [0])
+    for value in encoded_values:
+        value_offsets.append(value_offsets[-1] + len(value))
+
+    parts = [key_offsets.tobytes(), ids.tobytes(), value_offsets.tobytes(), slots.tobytes()]
+    parts.extend(key for key, _ in items)
+    parts.extend(encoded_values)
+    content = b''.join(parts)
+    return dict(size=len(items), value_count=len(values), slot_count=slot_count), content
+
+
+def save_string_tables(path: str, tables: Mapping[str, Mapping[str, str]], key: str) -> None:
+    """Save string tables to a file.
+
+    The file is written to a temporary file first and then renamed,
+    so concurrent readers never see a partially written file.
+
+    Args:
+        path: table file path
+        tables: mappings to save by table names
+        key: key of the table content (e.g. a hash of the source data), the tables are
+            loaded only with the same key
+
+    """
+    header = _get_header(key)
+    descriptions, contents = {}, []
+    offset = 0
+    for name, index in tables.items():
+        description, content = _pack_table(index)
+        descriptions[name] = dict(description, offset=offset)
+        content += b'\0' * (-len(content) % 4)  # align the next table
+        contents.append(content)
+        offset += len(content)
+    directory = json.dumps(descriptions).encode('utf-8') + b'\n'
+    padding = b'\0' * (-(len(header) + len(directory)) % 4)
+
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header + directory + padding)
+            for content in contents:
+                f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_string_tables(path: str, key: str) -> Optional[Dict[str, StringTable]]:
+    """Attach to the string tables saved to a file (see :py:func:`save_string_tables`).
+
+    Args:
+        path: table file path
+        key: expected key of the table content
+
+    Returns:
+        string tables by names or None if there is no file or it is outdated or broken
+
+    """
+    try:
+        with open(path, 'rb') as f:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header = _get_header(key)
+    if content[: len(header)] != header:
+        logger.info('* Outdated string table %s', path)
+        return None
+    directory_end = content.find(b'\n', len(header)) + 1
+    try:
+        descriptions = json.loads(content[len(header) : directory_end])
+        buffer = memoryview(content)
+        start = directory_end + (-directory_end % 4)
+        return {
+            name: StringTable(
+                buffer,
+                start + description['offset'],
+                description['size'],
+                description['value_count'],
+                description['slot_count'],
+            )
+            for name, description in descriptions.items()
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning('Broken string table %s: %s', path, e)
+        return None
@@ -0,0 +1,93 @@
+"""Per stage tracing of the fuzzy search.
+
+A :py:class:`Trace` records how long every stage of one fuzzy search takes (name cleaning,
+query parsing, searching, the OR query fallback, stored fields retrieval, reranking and
+sorting) and how many candidates the stage has produced. The stages are marked only
+if a trace is passed, so the search is not slowed down if tracing is disabled.
+
+Usage example::
+
+    from dicountries.tracing import Trace
+    from dicountries.whoosh_index import CountryIndex
+
+    country_index = CountryIndex()
+
+    trace = Trace('Rusia Federation')
+    country_index.normalize_country_detailed('Rusia Federation', trace=trace)
+    print(trace.to_dict())
+
+    traces = []
+    country_index.tracer = traces.append  # trace every fuzzy search
+    country_index.normalize_countries(['Rusia Federation', 'Gremany'])
+
+"""
+
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class Stage(NamedTuple):
+    """Finished search stage."""
+
+    #: stage name.
+    name: str
+
+    #: stage duration in seconds.
+    seconds: float
+
+    #: number of the candidates produced by the stage or None if the stage doesn't produce them.
+    count: Optional[int]
+
+
+class Trace:
+    """Durations and candidate counts of the search stages of one query.
+
+    Stages are finished by :py:meth:`mark`, every stage lasts from the end of the previous
+    one (or from the trace creation).
+
+    Args:
+        name: searched name
+
+    """
+
+    #: searched name.
+    name: str
+
+    #: finished stages in the order of their execution.
+    stages: List[Stage]
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        self.stages = []
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str, count: Optional[int] = None) -> None:
+        """Finish the current stage.
+
+        Args:
+            stage: stage name
+            count: number of the candidates produced by the stage
+
+        """
+        now = time.perf_counter()
+        self.stages.append(Stage(stage, now - self._last, count))
+        self._last = now
+
+    @property
+    def seconds(self) -> float:
+        """Total duration of the finished stages in seconds."""
+        return sum(stage.seconds for stage in self.stages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the trace as a dict.
+
+        Returns:
+            the searched name (**name**), the total duration (**seconds**) and the stages
+            (**stages**) with their names, durations and candidate counts
+
+        """
+        return dict(
+            name=self.name,
+            seconds=self.seconds,
+            stages=[stage._asdict() for stage in self.stages],
+        )
@@ -1,5 +1,13 @@
 """Some useful utils used by other modules."""
 
+import re
+import unicodedata
+
+from unidecode import unidecode
+
+#: Punctuation, underscores and whitespaces collapsed to one space by :py:func:`fold_name`.
+FOLD_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+
 
 def get_main_code(code: str) -> str:
     """Get code of the main country.
@@ -37,3 +45,50 @@ def reorder_name(name: str) -> str:
     name = name[1:] + [name[0]]
     name = ' '.join(name)
     return name
+
+
+def clean_name(name: str) -> str:
+    """Preprocess names before indexing.
+
+    Args:
+        name: name to preprocess
+
+    Returns:
+        preprocessed name
+
+    """
+    return unidecode(name or '').strip().replace('(', ' ').replace(')', ' ')
+
+
+def clean_sort_name(name: str) -> str:
+    """Preprocess names before additional sorting.
+
+    Args:
+        name: name to preprocess
+
+    Returns:
+        preprocessed name
+
+    """
+    return unidecode(name or '').strip().replace('(', ' ').replace(')', ' ')
+
+
+def fold_name(name: str) -> str:
+    """Get canonical folded form of the name for case and accent insensitive exact search.
+
+    The name is NFKC normalized, transliterated to ASCII, casefolded
+    and all punctuation and whitespace runs are replaced with one space.
+
+    Args:
+        name: name to fold
+
+    Returns:
+        folded name
+
+    Example:
+        **UNITED  STATES** and **Côte d’Ivoire** are folded to **united states** and
+        **cote d ivoire**
+
+    """
+    name = unidecode(unicodedata.normalize('NFKC', name or '')).casefold()
+    return FOLD_PATTERN.sub(' ', name).strip()
@@ -1,62 +1,135 @@
 """Whoosh based country search index."""
 
+# whoosh should be patched before any other whoosh imports
+from . import whoosh_patches  # noqa: F401 # isort:skip # pylint: disable=unused-import
+
 import asyncio
+import hashlib
+import json
 import logging
 import os
 import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, List, Optional, Tuple, cast
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 import pytz
 import whoosh
-from fuzzywuzzy import fuzz
-from unidecode import unidecode
 from whoosh.analysis import StandardAnalyzer
-from whoosh.fields import STORED, TEXT, Schema
-from whoosh.filedb.filestore import FileStorage, RamStorage, copy_storage
+from whoosh.fields import ID, STORED, TEXT, Schema
+from whoosh.filedb.filestore import copy_storage
 from whoosh.index import EmptyIndexError, FileIndex
 from whoosh.qparser import QueryParser, syntax
-from whoosh.query import FuzzyTerm
-
-from .base_types import StringMap
-from .loader import create_basename_by_name_super_index, load_post_process_country_mapping
-from .utils import reorder_name
+from whoosh.searching import Searcher
+
+from .backup import (
+    MappedStorage,
+    MemoryStorage,
+    get_backup_dir,
+    read_storage_files,
+    write_backup,
+)
+from .base_types import Index, StringMap
+from .cache import SearchCache
+from .dict_index import fold_index, group_folded_keys, update_folded_index
+from .fuzzy_index import (
+    COUNTRY_STOPLIST,
+    FUZZY_INDEXES,
+    FuzzyIndex,
+    SearchResults,
+    create_affected_name_check,
+    get_max_edits,
+    get_sort_form,
+    rate_names,
+)
+from .loader import (
+    create_basename_by_code_index,
+    load_post_process_country_mapping,
+    restore_index,
+    save_index,
+)
+from .metrics import (
+    CACHE,
+    CODE,
+    DEGRADED,
+    EXACT,
+    FOLDED,
+    MISS,
+    OR_FALLBACK,
+    REJECTED,
+    SEARCH,
+    Metrics,
+)
+from .prefilter import Prefilter
+from .query_budget import DEFAULT_QUERY_BUDGET, DeadlineFuzzyTerm, QueryBudget, search_until
+from .scorers import DEFAULT_SCORER, Scorer
+from .snapshot import get_data_hash, load_basename_by_name_super_index
+from .string_table import StringTable, load_string_tables, save_string_tables
+from .tracing import Trace
+from .utils import clean_name, fold_name, reorder_name
 
 logger = logging.getLogger('dicountries')
-logging.basicConfig(format='%(levelname)s  dicountries: %(message)s')
 
-COUNTRY_IX_VER = 1  # change this if you've changed the index schema,
+COUNTRY_IX_VER = 3  # change this if you've changed the index schema,
 # so old index will not be loaded in the Kubernetes pod
 
 DEFAULT_MAX_SEARCH_CACHE = 1000  # Max size of the country cache.
 
+DEFAULT_MAX_ASYNC_WORKERS = 4  # Max number of threads used by the asynchronous methods.
+
 OrGroup = syntax.OrGroup.factory(0.9)
 
 
-def _clean_name(name: str) -> str:
-    """Preprocess names before indexing.
+class IndexState(NamedTuple):
+    """Immutable snapshot of the data used by :py:class:`CountryIndex` to normalize names.
 
-    Args:
-        name: name to preprocess
+    A new snapshot is built completely and then published by a single reference assignment,
+    so readers take the current snapshot without any locks. The snapshot content is never
+    changed after it is published (the incremental refreshing and the synonym updates change
+    a copy of the whoosh index), only the :py:attr:`search_cache` entries are added and
+    evicted, the cache takes its own short lock for that.
+    """
 
-    Returns:
-        preprocessed name
+    #: mapping based on source country iso and synonym databases
+    #: for direct search (without fuzzy search).
+    simple_index: Optional[Index]
 
-    """
-    return unidecode(name or '').strip().replace('(', ' ').replace(')', ' ')
+    #: :py:attr:`simple_index` with folded keys (see :py:func:`dicountries.utils.fold_name`)
+    #: for case, accent and punctuation insensitive direct search.
+    folded_index: Optional[Index]
 
+    #: basename by country code mapping (ISO alpha-2, alpha-3, numeric, former country
+    #: and region codes) for direct search of the codes.
+    code_index: Optional[Index]
 
-def _clean_name2(name: str) -> str:
-    """Preprocess names before additional sorting.
+    #: prefilter fitted to the :py:attr:`simple_index` names or None if it is not used.
+    prefilter: Optional[Prefilter]
 
-    Args:
-        name: name to preprocess
+    #: whoosh index.
+    ix: Optional[whoosh.index.Index]
 
-    Returns:
-        preprocessed name
+    #: pure python fuzzy index (used instead of :py:attr:`ix` if the whoosh engine is not used).
+    fuzzy_ix: Optional[FuzzyIndex]
 
-    """
-    return unidecode(name or '').strip().replace('(', ' ').replace(')', ' ')
+    #: A mapping to postprocess country names.
+    post_process_country_map: StringMap
+
+    #: LRU cache for the fuzzy search results of this snapshot.
+    search_cache: SearchCache
 
 
 class CountryIndex:  # pylint: disable=too-many-instance-attributes
@@ -75,9 +148,37 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
                 calling the :py:meth:`refresh` method explicitly
             post_process_country_map: a mapping to postprocess normalized names (None or empty map
                 if no postprocessing required)
-            use_async: use asyncio and threads to search and index simultaneously
-            max_search_cache: max search cache size. If ``max_search_cache`` is reached the cache
-                will be cleared and reinitialized
+            use_async: restore or build the index in the :py:attr:`executor` without blocking the
+                running event loop (await :py:meth:`wait_ready` to wait until it is done)
+            max_search_cache: max search cache size. If ``max_search_cache`` is reached the least
+                recently used cache entry is evicted
+            search_cache_ttl: time to live of the search cache entries in seconds
+                (None if entries should not expire)
+            use_snapshot: load the country databases from a binary snapshot saved next to the
+                index backup (the snapshot is created on the first use and recreated if
+                the package data has changed)
+            engine: fuzzy search engine: **whoosh** (default) or one of the pure python
+                engines from :py:data:`dicountries.fuzzy_index.FUZZY_INDEXES` (e.g. **ngram**).
+                The pure python engines are built in memory and are not backed up on disk
+            executor: executor used by the asynchronous methods. If it is None a thread pool
+                with ``max_async_workers`` threads is created on the first use
+            max_async_workers: max number of threads used by the asynchronous methods
+                if ``executor`` is None
+            scorer: scorer to rate the names found by fuzzy search
+                (:py:data:`dicountries.scorers.DEFAULT_SCORER` if None)
+            use_mmap: serve the whoosh index from the memory mapped backup files instead of
+                copying them to memory and use the memory mapped direct search tables
+                saved next to the index backup, so the processes using the same index
+                directory share the index pages (see :py:class:`dicountries.backup.MappedStorage`
+                and :py:class:`dicountries.string_table.StringTable`)
+            metrics: metrics to collect the name resolution counters and latencies
+                (the metrics are not collected if None)
+            tracer: callback called with the :py:class:`dicountries.tracing.Trace` of every
+                fuzzy search (the searches are not traced if None)
+            prefilter: prefilter rejecting hopeless names before fuzzy search, it is fitted to
+                the indexed names on every refresh (all names are searched if None)
+            query_budget: cost limits of the whoosh search queries
+                (:py:data:`dicountries.query_budget.DEFAULT_QUERY_BUDGET` if None)
 
     Usage example::
 
@@ -92,21 +193,13 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
 
     """
 
-    #: A mapping to postprocess country names or None.
-    post_process_country_map: StringMap
-
-    #: threading.Lock: Lock object for the :py:attr:`simple_index` attribute.
-    simple_index_lock: threading.Lock
-
-    #: mapping based on source country iso and synonym databases
-    #: for direct search (without fuzzy search).
-    simple_index: Optional[StringMap]
+    #: current data snapshot (simple index, whoosh or pure python index, postprocess map and
+    #: search cache). It is replaced as a whole by the index refreshing, readers take no locks.
+    state: IndexState
 
-    #: threading.Lock: lock object for the :py:attr:`ix` attribute.
-    ix_lock: threading.Lock
-
-    #: whoosh index.
-    ix: whoosh.index.Index
+    #: fuzzy search engine name (**whoosh** or a key of
+    #: :py:data:`dicountries.fuzzy_index.FUZZY_INDEXES`).
+    engine: str
 
     #: class version (determines backup format).
     version: int
@@ -114,106 +207,265 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
     #: str: backup path (default **f'indexes/countries_{COUNTRY_IX_VER}'**).
     path: str
 
+    #: use the super index snapshot (see :py:mod:`dicountries.snapshot`).
+    use_snapshot: bool
+
+    #: runtime synonyms applied to the country databases: base names by names
+    #: (None for removed names), see :py:meth:`add_synonyms` and :py:meth:`remove_synonyms`.
+    synonyms: Dict[str, Optional[str]]
+
     #: threading.Lock: lock object for the :py:attr:`last_update` attribute.
     last_update_lock: threading.Lock
 
     #: last update time.
     last_update: Optional[datetime]
 
-    #: threading.Lock: lock object for the index refreshing.
+    #: threading.Lock: lock object for the index refreshing and the :py:attr:`state` publishing.
     update_lock: threading.Lock
 
-    #: mapping for the country searching cache (not saved to disk).
-    search_cache: StringMap
+    #: threading.Lock: lock object for the backup writing (see :py:meth:`backup_index`).
+    backup_lock: threading.Lock
 
-    #: max search cache size. If cache reaches this size it will is reinitialized.
+    #: max search cache size. If cache reaches this size the least recently used entry is evicted.
     max_search_cache: int
 
-    def __init__(
+    #: time to live of the search cache entries in seconds or None.
+    search_cache_ttl: Optional[float]
+
+    #: executor used by the asynchronous methods.
+    executor: Optional[Executor]
+
+    #: max number of threads in the executor created for the asynchronous methods.
+    max_async_workers: int
+
+    #: scorer to rate the names found by fuzzy search.
+    scorer: Scorer
+
+    #: serve the whoosh index and the direct search indexes from the memory mapped files.
+    use_mmap: bool
+
+    #: name resolution counters and latencies or None if the metrics are not collected.
+    metrics: Optional[Metrics]
+
+    #: callback called with the trace of every fuzzy search or None if they are not traced.
+    tracer: Optional[Callable[[Trace], None]]
+
+    #: prefilter settings (the fitted prefilter is :py:attr:`IndexState.prefilter`).
+    prefilter: Optional[Prefilter]
+
+    #: cost limits of the whoosh search queries.
+    query_budget: QueryBudget
+
+    #: future of the index restoring or building started by ``use_async=True``.
+    init_future: Optional['asyncio.Future[None]']
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         index_path: Optional[str] = None,
         post_process_country_map: Optional[StringMap] = None,
         use_async: bool = False,
         max_search_cache: int = DEFAULT_MAX_SEARCH_CACHE,
+        search_cache_ttl: Optional[float] = None,
+        use_snapshot: bool = True,
+        engine: str = 'whoosh',
+        executor: Optional[Executor] = None,
+        max_async_workers: int = DEFAULT_MAX_ASYNC_WORKERS,
+        scorer: Optional[Scorer] = None,
+        use_mmap: bool = False,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Callable[[Trace], None]] = None,
+        prefilter: Optional[Prefilter] = None,
+        query_budget: Optional[QueryBudget] = None,
     ):
         if post_process_country_map is None:
-            self.post_process_country_map = load_post_process_country_mapping()
-        else:
-            self.post_process_country_map = post_process_country_map
-        self.simple_index_lock = threading.Lock()
-        self.simple_index = None
-        self.ix_lock = threading.Lock()
-        self.ix = None
+            post_process_country_map = load_post_process_country_mapping()
+        if engine != 'whoosh' and engine not in FUZZY_INDEXES:
+            raise ValueError(f'Unknown search engine: {engine}')
+        self.engine = engine
         self.version = COUNTRY_IX_VER
         if not index_path:
             self.path = f'indexes/countries_{COUNTRY_IX_VER}'
         else:
             self.path = index_path
+        self.use_snapshot = use_snapshot
+        self.synonyms = {}
+        if os.path.exists(self.get_synonyms_path()):
+            try:
+                self.synonyms = dict(restore_index(self.get_synonyms_path()))
+            except ValueError as e:
+                logger.warning('Can not load synonyms %s: %s', self.get_synonyms_path(), e)
         self.last_update_lock = threading.Lock()
         self.last_update = None
         self.update_lock = threading.Lock()
-        self.search_cache = {}
+        self.backup_lock = threading.Lock()
+        self._backup_seq = 0
+        self._written_backup_seq = 0
         self.max_search_cache = max_search_cache
-
+        self.search_cache_ttl = search_cache_ttl
+        self.state = IndexState(
+            simple_index=None,
+            folded_index=None,
+            code_index=None,
+            prefilter=None,
+            ix=None,
+            fuzzy_ix=None,
+            post_process_country_map=post_process_country_map,
+            search_cache=self._create_search_cache(),
+        )
+        self.executor = executor
+        self._own_executor = False
+        self._executor_lock = threading.Lock()
+        self.max_async_workers = max_async_workers
+        self.scorer = scorer or DEFAULT_SCORER
+        self.use_mmap = use_mmap
+        self._shared_tables: Dict[str, StringTable] = {}
+        self._fold_groups: Tuple[Optional[Index], Dict[str, Set[str]]] = (None, {})
+        self.metrics = metrics
+        self.tracer = tracer
+        self.prefilter = prefilter
+        self.query_budget = DEFAULT_QUERY_BUDGET if query_budget is None else query_budget
+        self._pending_searches: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+        self.init_future = None
         if use_async:
-            asyncio.get_event_loop().run_in_executor(None, self.restore_backuped_index)
+            self.init_future = asyncio.get_event_loop().run_in_executor(
+                self.get_executor(), self._init_index
+            )
         else:
-            self.restore_backuped_index()
-        if not self.ix:
-            if use_async:
-                asyncio.get_event_loop().run_in_executor(None, self.refresh)
+            self._init_index()
+
+    def _init_index(self) -> None:
+        """Restore the index from the disk or build it if there is no saved index."""
+        self.restore_backuped_index()
+        if not self.get_index() and not self.get_fuzzy_index():
+            self.refresh()
+
+    async def wait_ready(self) -> None:
+        """Wait until the index restoring or building started by ``use_async=True`` is done."""
+        if self.init_future is not None:
+            await asyncio.shield(self.init_future)
+
+    def get_executor(self) -> Executor:
+        """Get executor used by the asynchronous methods (create it if required).
+
+        Returns:
+            executor
+
+        """
+        with self._executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_async_workers, thread_name_prefix='dicountries'
+                )
+                self._own_executor = True
+            return self.executor
+
+    def close(self) -> None:
+        """Shut down the executor created for the asynchronous methods."""
+        with self._executor_lock:
+            if self._own_executor and self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+                self._own_executor = False
+
+    @property
+    def simple_index(self) -> Optional[Index]:
+        """Direct search mapping of the current :py:attr:`state`."""
+        return self.state.simple_index
+
+    @property
+    def folded_index(self) -> Optional[Index]:
+        """Folded direct search mapping of the current :py:attr:`state`."""
+        return self.state.folded_index
+
+    @property
+    def code_index(self) -> Optional[Index]:
+        """Country code direct search mapping of the current :py:attr:`state`."""
+        return self.state.code_index
+
+    @property
+    def ix(self) -> Optional[whoosh.index.Index]:
+        """Whoosh index of the current :py:attr:`state`."""
+        return self.state.ix
+
+    @property
+    def fuzzy_ix(self) -> Optional[FuzzyIndex]:
+        """Pure python fuzzy index of the current :py:attr:`state`."""
+        return self.state.fuzzy_ix
+
+    @property
+    def search_cache(self) -> SearchCache:
+        """Search cache of the current :py:attr:`state` (a new cache is used after refreshing)."""
+        return self.state.search_cache
+
+    @property
+    def post_process_country_map(self) -> StringMap:
+        """A mapping to postprocess country names."""
+        return self.state.post_process_country_map
+
+    @post_process_country_map.setter
+    def post_process_country_map(self, value: StringMap) -> None:
+        self._publish(post_process_country_map=value)
+
+    def _create_search_cache(self) -> SearchCache:
+        """Create an empty search cache.
+
+        Returns:
+            search cache
+
+        """
+        return SearchCache(self.max_search_cache, self.search_cache_ttl)
+
+    def _publish(self, **changes: Any) -> None:
+        """Publish a new :py:attr:`state` with a new search cache.
+
+        Args:
+            changes: changed :py:class:`IndexState` fields
+
+        """
+        with self.update_lock:
+            self._publish_unlocked(**changes)
+
+    def _publish_unlocked(self, **changes: Any) -> None:
+        """Publish a new :py:attr:`state` (the :py:attr:`update_lock` should be acquired).
+
+        The :py:attr:`IndexState.folded_index` is rebuilt (or the shared one is attached),
+        the :py:attr:`IndexState.prefilter` is refitted and the :py:attr:`IndexState.code_index`
+        is built (once, the codes don't depend on the synonyms) if
+        the :py:attr:`IndexState.simple_index` is changed.
+
+        Args:
+            changes: changed :py:class:`IndexState` fields
+
+        """
+        changes.setdefault('search_cache', self._create_search_cache())
+        if 'simple_index' in changes and 'folded_index' not in changes:
+            simple_index = changes['simple_index']
+            if simple_index is not None and simple_index is self._shared_tables.get('exact'):
+                changes['folded_index'] = self._shared_tables['folded']
             else:
-                self.refresh()
+                changes['folded_index'] = fold_index(simple_index) if simple_index else None
+        if 'simple_index' in changes and 'prefilter' not in changes:
+            simple_index = changes['simple_index']
+            changes['prefilter'] = (
+                self.prefilter.fit(simple_index) if self.prefilter and simple_index else None
+            )
+        if 'simple_index' in changes and 'code_index' not in changes:
+            code_index = None
+            if changes['simple_index']:
+                code_index = self.state.code_index or create_basename_by_code_index()
+            changes['code_index'] = code_index
+        self.state = self.state._replace(**changes)
 
     #: whoosh search schema
     schema = Schema(
-        decoded_country=TEXT(
-            phrase=False,
-            analyzer=StandardAnalyzer(
-                stoplist=frozenset(  # exclude us from standard stopwords
-                    [
-                        'and',
-                        'is',
-                        'it',
-                        'an',
-                        'as',
-                        'at',
-                        'have',
-                        'in',
-                        'yet',
-                        'if',
-                        'from',
-                        'for',
-                        'when',
-                        'by',
-                        'to',
-                        'you',
-                        'be',
-                        'we',
-                        'that',
-                        'may',
-                        'not',
-                        'with',
-                        'tbd',
-                        'a',
-                        'on',
-                        'your',
-                        'this',
-                        'of',
-                        'will',
-                        'can',
-                        'the',
-                        'or',
-                        'are',
-                    ]
-                )
-            ),
-        ),
-        country=STORED(),
+        decoded_country=TEXT(phrase=False, analyzer=StandardAnalyzer(stoplist=COUNTRY_STOPLIST)),
+        country=ID(stored=True, unique=True),
         basecountry=STORED(),
+        sortedcountry=STORED(),
     )
 
-    class CountryTermClass(FuzzyTerm):
+    class CountryTermClass(DeadlineFuzzyTerm):
         """Class controls number of typo mistakes as dependency on the term length.
 
         Args:
@@ -235,15 +487,9 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
             constantscore: bool = False,
         ):
             del maxdist
-            maxdist: int = 3
-            if len(text) < 4:
-                maxdist = 0
-            elif len(text) < 11:
-                maxdist = 1
-            elif len(text) < 16:
-                maxdist = 2
-
-            super().__init__(fieldname, text, boost, maxdist, prefixlength, constantscore)
+            super().__init__(
+                fieldname, text, boost, get_max_edits(text), prefixlength, constantscore
+            )
 
     def post_process_name(self, name: str, postprocess: bool = True) -> str:
         """Postprocess names after whoosh searching.
@@ -263,9 +509,7 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
         """
         if not postprocess:
             return name
-        if name in self.post_process_country_map:
-            return self.post_process_country_map[name]
-        return name
+        return self.state.post_process_country_map.get(name, name)
 
     def get_backup_path(self) -> str:
         """Get backup path where index is saved on disk.
@@ -276,15 +520,208 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
         """
         return self.path
 
-    def get_index(self) -> whoosh.index.Index:
+    def get_snapshot_path(self) -> Optional[str]:
+        """Get path of the super index snapshot.
+
+        Returns:
+            snapshot path or None if snapshot is not used
+
+        """
+        if not self.use_snapshot:
+            return None
+        return f'{self.path}.snapshot'
+
+    def get_synonyms_path(self) -> str:
+        """Get path of the persisted runtime synonyms (see :py:meth:`add_synonyms`).
+
+        Returns:
+            synonyms json file path
+
+        """
+        return f'{self.path}.synonyms.json'
+
+    def get_table_path(self) -> str:
+        """Get path of the shared direct search tables (see :py:attr:`use_mmap`).
+
+        Returns:
+            string table file path
+
+        """
+        return f'{self.path}.table'
+
+    def load_super_index(self) -> Index:
+        """Load the basename by name super index (from the snapshot if it is used).
+
+        The runtime :py:attr:`synonyms` are applied to the loaded index.
+        If :py:attr:`use_mmap` is set, the memory mapped table shared by the processes is
+        returned (see :py:meth:`_load_shared_index`).
+
+        Returns:
+            combined country (main, region, former), synonym index
+
+        """
+        if self.use_mmap:
+            return self._load_shared_index()
+        data = load_basename_by_name_super_index(self.get_snapshot_path())
+        return self._apply_synonyms(data, self.synonyms)
+
+    def _load_shared_index(self) -> Index:
+        """Attach to the shared direct search tables or create them if they can't be used.
+
+        The tables are keyed by the hash of the package data and the runtime
+        :py:attr:`synonyms`, so the tables created by the first process are used by the other
+        ones and the tables are recreated if the data or the synonyms have changed.
+
+        Returns:
+            combined country (main, region, former), synonym index
+
+        """
+        key = hashlib.sha256(get_data_hash().encode('ascii'))
+        key.update(json.dumps(self.synonyms, sort_keys=True).encode('utf-8'))
+        tables = load_string_tables(self.get_table_path(), key.hexdigest())
+        if tables is None:
+            data = load_basename_by_name_super_index(self.get_snapshot_path())
+            data = self._apply_synonyms(data, self.synonyms)
+            try:
+                save_string_tables(
+                    self.get_table_path(),
+                    dict(exact=data, folded=fold_index(data)),
+                    key.hexdigest(),
+                )
+            except OSError as e:
+                logger.warning('Can not save countries table %s: %s', self.get_table_path(), e)
+                return data
+            tables = load_string_tables(self.get_table_path(), key.hexdigest())
+            if tables is None:
+                return data
+        self._shared_tables = tables
+        return cast(Index, tables['exact'])
+
+    @staticmethod
+    def _apply_synonyms(data: Index, synonyms: Dict[str, Optional[str]]) -> Index:
+        """Apply runtime synonyms to the basename by name index.
+
+        Args:
+            data: index to change
+            synonyms: base names by names (None for the names to remove)
+
+        Returns:
+            the changed ``data``
+
+        """
+        for name, basename in synonyms.items():
+            if basename is None:
+                data.pop(name, None)
+            else:
+                data[name] = basename
+        return data
+
+    def add_synonyms(self, synonyms: StringMap, persist: bool = False) -> None:
+        """Add or change names of the direct and the fuzzy index at runtime.
+
+        Only the changed names are reindexed and only the search cache entries which
+        results can contain the changed names are invalidated. The synonyms are kept
+        by the index refreshing.
+
+        Args:
+            synonyms: base names by names
+            persist: save all runtime synonyms next to the index backup
+                (see :py:meth:`get_synonyms_path`) to load them on the next start
+
+        """
+        self._change_synonyms(dict(synonyms), persist)
+
+    def remove_synonyms(self, names: Iterable[str], persist: bool = False) -> None:
+        """Remove names from the direct and the fuzzy index at runtime.
+
+        Works like :py:meth:`add_synonyms`.
+
+        Args:
+            names: names to remove
+            persist: save all runtime synonyms next to the index backup
+
+        """
+        self._change_synonyms(dict.fromkeys(names), persist)
+
+    def _change_synonyms(self, synonyms: Dict[str, Optional[str]], persist: bool) -> None:
+        """Apply runtime synonyms to the current :py:attr:`state` and publish a new one.
+
+        Args:
+            synonyms: base names by names (None for the names to remove)
+            persist: save all runtime synonyms next to the index backup
+
+        """
+        backup = None
+        with self.update_lock:
+            self.synonyms.update(synonyms)
+            if persist:
+                os.makedirs(os.path.dirname(self.get_synonyms_path()) or '.', exist_ok=True)
+                save_index(cast(Index, self.synonyms), self.get_synonyms_path())
+            state = self.state
+            if state.simple_index is None:
+                return  # the synonyms will be applied by the index building
+            data = self._apply_synonyms(dict(state.simple_index), synonyms)
+            changed = [name for name in synonyms if state.simple_index.get(name) != data.get(name)]
+            if not changed:
+                return
+            changes: Dict[str, Any] = self._get_exact_changes_unlocked(data, changed)
+            if self.engine != 'whoosh':
+                changes['fuzzy_ix'] = FUZZY_INDEXES[self.engine](data)
+            elif state.ix:
+                changes['ix'] = self._get_mutable_index_unlocked()
+                self._update_index(changes['ix'], data, changed)
+            search_cache = state.search_cache.copy(
+                changed, exclude_if=create_affected_name_check(changed)
+            )
+            self._publish_unlocked(search_cache=search_cache, **changes)
+            if persist:
+                backup = self._capture_backup_unlocked()
+        if backup:
+            self._write_backup(*backup)
+
+    def _get_exact_changes_unlocked(self, data: Index, changed: List[str]) -> Dict[str, Any]:
+        """Update the direct search data of the current :py:attr:`state` after the changes
+        of some names (the :py:attr:`update_lock` should be acquired).
+
+        Only the folded keys of the changed names are recalculated and only the trigrams
+        of the added names are added to the prefilter.
+
+        Args:
+            data: changed :py:attr:`IndexState.simple_index`
+            changed: added, changed or removed names
+
+        Returns:
+            changed :py:class:`IndexState` fields
+
+        """
+        state = self.state
+        if self._fold_groups[0] is not state.simple_index:
+            self._fold_groups = (state.simple_index, group_folded_keys(state.simple_index or {}))
+        folded_index = dict(state.folded_index or {})
+        update_folded_index(folded_index, data, self._fold_groups[1], changed)
+        self._fold_groups = (data, self._fold_groups[1])
+        prefilter = state.prefilter
+        if prefilter is not None:
+            prefilter = prefilter.extend(name for name in changed if name in data)
+        return dict(simple_index=data, folded_index=folded_index, prefilter=prefilter)
+
+    def get_index(self) -> Optional[whoosh.index.Index]:
         """Get whoosh index (thread safe).
 
         Returns:
             whoosh index
 
         """
-        with self.ix_lock:
-            return self.ix
+        return self.state.ix
+
+    def get_fuzzy_index(self) -> Optional[FuzzyIndex]:
+        """Get pure python fuzzy index (thread safe).
+
+        Returns:
+            pure python fuzzy index or None if the whoosh engine is used
+
+        """
+        return self.state.fuzzy_ix
 
     def create_whoosh_ram_index(self) -> whoosh.index.Index:
         """Create inmemory whoosh index.
@@ -293,61 +730,216 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
             Empty inmemory whoosh index
 
         """
-        storage = RamStorage()
+        storage = MemoryStorage()
         return FileIndex.create(storage, self.schema, 'MAIN')
 
+    def _get_mutable_index_unlocked(self) -> Optional[whoosh.index.Index]:
+        """Get a copy of the whoosh index to update (the :py:attr:`update_lock` should be acquired).
+
+        The published indexes are never changed (the searches of the current :py:attr:`state`
+        keep using its index and the mapped indexes are read-only), so the current index
+        is copied to memory and the copy should be published after the update.
+
+        Returns:
+            the copy of the current whoosh index or None if there is no index
+
+        """
+        cur_ix = self.state.ix
+        if cur_ix is None:
+            return None
+        new_ix = self.create_whoosh_ram_index()
+        copy_storage(cur_ix.storage, new_ix.storage)
+        return new_ix
+
+    def _capture_backup_unlocked(
+        self,
+    ) -> Optional[Tuple[int, whoosh.index.Index, Dict[str, Any]]]:
+        """Capture the whoosh index files to backup (the :py:attr:`update_lock` should be acquired).
+
+        The whoosh index is in a :py:class:`whoosh.filedb.filestore.RamStorage`, so only
+        the references to the immutable file contents are taken.
+
+        Returns:
+            backup sequence number, the captured index and file contents by file names
+            or None if there is no index
+
+        """
+        cur_ix = self.state.ix
+        if not cur_ix:
+            return None
+        self._backup_seq += 1
+        return self._backup_seq, cur_ix, read_storage_files(cur_ix.storage)
+
+    def _write_backup(self, seq: int, ix: whoosh.index.Index, files: Dict[str, Any]) -> None:
+        """Write captured whoosh index files to the disk (see :py:mod:`dicountries.backup`).
+
+        Called without the :py:attr:`update_lock`, so searching and refreshing are not blocked
+        by the disk writes. A capture older than the already written one is skipped.
+        If :py:attr:`use_mmap` is set and the captured index is still the current one,
+        it is replaced with the mapped backup.
+
+        The new index is already published, so the disk errors are only logged.
+
+        Args:
+            seq: backup sequence number
+            ix: captured whoosh index
+            files: file contents by file names
+
+        """
+        try:
+            with self.backup_lock:
+                if seq <= self._written_backup_seq:
+                    return
+                generation_path = write_backup(self.path, files)
+                self._written_backup_seq = seq
+            if not self.use_mmap or isinstance(ix.storage, MappedStorage):
+                return
+            # the generation can be already replaced and removed by another process
+            mapped_ix = MappedStorage(generation_path).open_index()
+        except (EmptyIndexError, OSError) as e:
+            logger.warning('Can not backup countries index %s: %s', self.path, e)
+            return
+        with self.update_lock:
+            if self.state.ix is ix:
+                self._publish_unlocked(ix=mapped_ix, search_cache=self.state.search_cache)
+
     def backup_index(self) -> None:
-        """Backup whoosh index in on disk file."""
-        os.makedirs(self.path, exist_ok=True)
-        with self.ix_lock:
-            if self.ix:
-                with FileStorage(self.path) as file_storage:
-                    copy_storage(self.ix.storage, file_storage)
+        """Backup whoosh index in on disk file.
+
+        The backup is crash safe: a new backup generation is written next to the previous one
+        and published by an atomic manifest replacement (see :py:mod:`dicountries.backup`).
+
+        """
+        with self.update_lock:
+            backup = self._capture_backup_unlocked()
+        if backup:
+            self._write_backup(*backup)
 
     async def restore_backuped_index_async(self) -> None:
         """Restore whoosh index from a file on disk to memory. Asynchronous version."""
-        asyncio.get_event_loop().run_in_executor(None, self.restore_backuped_index)
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.get_executor(), self.restore_backuped_index)
 
     def restore_backuped_index(self) -> None:
-        """Restore whoosh index from a file on disk to memory. Synchronous version."""
-        with self.simple_index_lock:
-            if not self.simple_index:
-                self.simple_index = create_basename_by_name_super_index()
-        os.makedirs(self.path, exist_ok=True)
-        try:
-            saved_ix = whoosh.index.open_dir(self.path)
-        except EmptyIndexError:
-            return
-        cur_ix = self.create_whoosh_ram_index()
-        copy_storage(saved_ix.storage, cur_ix.storage)
-        with self.ix_lock:
-            self.ix = cur_ix
+        """Restore whoosh index from a file on disk to memory. Synchronous version.
+
+        If :py:attr:`use_mmap` is set, the memory mapped backup files are used as is
+        and only their sizes are checked against the backup manifest.
 
-    def refresh(self, update_datetime: datetime = None) -> None:
+        """
+        with self.update_lock:
+            data = self.state.simple_index or self.load_super_index()
+            if self.engine != 'whoosh':
+                self._publish_unlocked(simple_index=data, fuzzy_ix=FUZZY_INDEXES[self.engine](data))
+                return
+            backup_dir = get_backup_dir(self.path, verify_hashes=not self.use_mmap)
+            try:
+                saved_ix = MappedStorage(backup_dir).open_index() if backup_dir else None
+            except (EmptyIndexError, OSError):
+                # the backup is missing or it is removed by a backup of another process
+                saved_ix = None
+            if saved_ix is None or saved_ix.schema != self.schema:
+                # there is no backup or it has an outdated schema, so refreshing is required
+                self._publish_unlocked(simple_index=data, search_cache=self.state.search_cache)
+                return
+            if self.use_mmap:
+                self._publish_unlocked(simple_index=data, ix=saved_ix)
+                return
+            cur_ix = self.create_whoosh_ram_index()
+            copy_storage(saved_ix.storage, cur_ix.storage)
+            self._publish_unlocked(simple_index=data, ix=cur_ix)
+
+    def refresh(self, update_datetime: datetime = None, incremental: bool = False) -> None:
         """Refresh whoosh country index. Synchronous version.
 
         Args:
             update_datetime: last refresh time to control if a new refresh is required
+            incremental: apply only the changes of the country databases to a copy of
+                the current whoosh index instead of rebuilding it (see :py:meth:`_update_index`)
 
         """
-        self._refresh(update_datetime=update_datetime)
+        self._refresh(update_datetime=update_datetime, incremental=incremental)
 
-    async def refresh_async(self, update_datetime: datetime = None) -> None:
+    async def refresh_async(
+        self, update_datetime: datetime = None, incremental: bool = False
+    ) -> None:
         """Refresh whoosh country index. Asynchronous version.
 
         Args:
             update_datetime: last refresh time to control if a new refresh is required
+            incremental: apply only the changes of the country databases to a copy of
+                the current whoosh index instead of rebuilding it (see :py:meth:`_update_index`)
+
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            self.get_executor(), partial(self._refresh, update_datetime, incremental)
+        )
+
+    @staticmethod
+    def _create_document(name: str, basename: str) -> Dict[str, str]:
+        """Create whoosh document for an indexed name.
+
+        Args:
+            name: indexed name
+            basename: base name of the indexed name
+
+        Returns:
+            whoosh document fields
 
         """
-        asyncio.get_event_loop().run_in_executor(None, self._refresh, update_datetime)
+        return dict(
+            country=name,
+            decoded_country=clean_name(name),
+            basecountry=basename,
+            sortedcountry=get_sort_form(name),
+        )
+
+    def _update_index(
+        self, cur_ix: whoosh.index.Index, data: Index, names: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Apply the difference between the current direct index and the new one to the index.
+
+        Documents of the removed names are deleted, documents of the added and changed names
+        are updated. The opened searchers are not affected by the changes.
 
-    def _refresh(self, update_datetime: datetime = None):
+        Args:
+            cur_ix: whoosh index to update (a copy of the current one)
+            data: new basename by name super index
+            names: names which can be changed (all names are compared if None)
+
+        Returns:
+            True if the index is changed
+
+        """
+        old_data = self.state.simple_index or {}
+        if names is None:
+            removed = [name for name in old_data if name not in data]
+            updated = [name for name, basename in data.items() if old_data.get(name) != basename]
+        else:
+            names = list(names)
+            removed = [name for name in names if name in old_data and name not in data]
+            updated = [name for name in names if name in data and old_data.get(name) != data[name]]
+        if not removed and not updated:
+            return False
+        logger.info('* Update %s and remove %s countries...', len(updated), len(removed))
+        writer = cur_ix.writer()
+        for name in removed:
+            writer.delete_by_term('country', name)
+        for name in updated:
+            writer.update_document(**self._create_document(name, data[name]))
+        writer.commit()
+        return True
+
+    def _refresh(self, update_datetime: datetime = None, incremental: bool = False):
         """Refresh whoosh index. Internal implementation.
 
         Args:
             update_datetime: last refresh time to control if a new refresh is required
+            incremental: apply only the changes to a copy of the current whoosh index if it exists
 
         """
+        backup = None
         with self.update_lock:
             if update_datetime:
                 with self.last_update_lock:
@@ -358,40 +950,145 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
             logger.info('* Updating indices for countries...')
 
             logger.info('* Load countries information...')
-            data = create_basename_by_name_super_index()
-            with self.simple_index_lock:
-                self.simple_index = data
+            data = self.load_super_index()
 
             logger.info('* Parse countries information...')
-            new_ix = self.create_whoosh_ram_index()
-            writer = new_ix.writer()
+            if self.engine != 'whoosh':
+                self._publish_unlocked(simple_index=data, fuzzy_ix=FUZZY_INDEXES[self.engine](data))
+                with self.last_update_lock:
+                    self.last_update = datetime.utcnow().replace(tzinfo=pytz.timezone('utc'))
+                return
+
+            cur_ix = self._get_mutable_index_unlocked() if incremental else None
+            if cur_ix:
+                if self._update_index(cur_ix, data):
+                    self._publish_unlocked(simple_index=data, ix=cur_ix)
+                    backup = self._capture_backup_unlocked()
+            else:
+                new_ix = self.create_whoosh_ram_index()
+                writer = new_ix.writer()
 
-            for k, v in data.items():
-                mapped_data = {}
-                mapped_data['country'] = k
-                mapped_data['decoded_country'] = _clean_name(k)
-                mapped_data['basecountry'] = v
-                writer.add_document(**mapped_data)
+                for k, v in data.items():
+                    writer.add_document(**self._create_document(k, v))
 
-            logger.info('* Save countries information...')
-            writer.commit()
+                logger.info('* Save countries information...')
+                writer.commit()
 
-            with self.ix_lock:
-                self.ix = new_ix
+                self._publish_unlocked(simple_index=data, ix=new_ix)
 
-            self.backup_index()
+                backup = self._capture_backup_unlocked()
 
             with self.last_update_lock:
                 self.last_update = datetime.utcnow().replace(tzinfo=pytz.timezone('utc'))
+        if backup:
+            self._write_backup(*backup)
+
+    def _create_query_parsers(self) -> Tuple[QueryParser, QueryParser]:
+        """Create query parsers used for the country search.
+
+        Returns:
+            a parser combining terms with AND and a fallback parser combining terms with OR
+
+        """
+        and_qp = QueryParser('decoded_country', schema=self.schema, termclass=self.CountryTermClass)
+        or_qp = QueryParser(
+            'decoded_country', schema=self.schema, termclass=self.CountryTermClass, group=OrGroup,
+        )
+        return and_qp, or_qp
+
+    @staticmethod
+    def _search(
+        searcher: Searcher,
+        parsers: Tuple[QueryParser, QueryParser],
+        name: str,
+        limit: Optional[int] = None,
+        scorer: Optional[Scorer] = None,
+        metrics: Optional[Metrics] = None,
+        trace: Optional[Trace] = None,
+        budget: QueryBudget = DEFAULT_QUERY_BUDGET,
+    ) -> SearchResults:
+        """Search the name using an opened whoosh searcher.
+
+        The queries are limited by the ``budget`` and the OR query fallback is skipped after
+        the deadline (the documents found before the deadline are rated).
+
+        Args:
+            searcher: opened whoosh searcher
+            parsers: query parsers created by :py:meth:`_create_query_parsers`
+            name: country name to normalize
+            limit: How many results should be searched (None to find all possible results)
+            scorer: scorer to rate the found names
+                (see :py:func:`dicountries.fuzzy_index.rate_names`)
+            metrics: metrics to count the OR query fallbacks and the degraded searches
+            trace: trace to mark the search stages (see :py:mod:`dicountries.tracing`)
+            budget: cost limits of the queries (see :py:mod:`dicountries.query_budget`)
+
+        Returns:
+            All possible variants from the whoosh index for the name and their rates.
+
+        """
+        country = clean_name(name)
+        if trace is not None:
+            trace.mark('clean')
+        if not country:
+            return 0, []
+        query = f'decoded_country:({country})'
+        # logger.debug(f'query: {query}')
+
+        deadline = budget.get_deadline()
+        and_qp, or_qp = parsers
+        q, limited = budget.limit_query(and_qp.parse(query), deadline)
+        if trace is not None:
+            trace.mark('parse')
+        results, timed_out = search_until(searcher, q, deadline)
+        if trace is not None:
+            trace.mark('search', len(results))
+        if not results and not timed_out:
+            if metrics is not None:
+                metrics.inc(OR_FALLBACK)
+            q, limited = budget.limit_query(or_qp.parse(query), deadline)
+            if trace is not None:
+                trace.mark('or_parse')
+            results, timed_out = search_until(searcher, q, deadline)
+            if trace is not None:
+                trace.mark('or_search', len(results))
+        if (limited or timed_out) and metrics is not None:
+            metrics.inc(DEGRADED)
+        hits = ((hit['country'], hit['basecountry'], hit['sortedcountry']) for hit in results)
+        return rate_names(name, hits, limit, scorer, trace)
+
+    @staticmethod
+    def _get_base_name(name: str, results: SearchResults) -> str:
+        """Get the best normalized name from the search results.
+
+        Args:
+            name: searched name
+            results: search results returned by :py:meth:`_search`
+
+        Returns:
+            normalized country name (not postprocessed) or the ``name`` if nothing was found
+
+        """
+        if not results[0]:
+            logger.info('! missed %s', name)
+            return name
+        return results[1][0].get('basecountry') or name
 
     def normalize_country_detailed(
-        self, name: str, limit: Optional[int] = None
-    ) -> Tuple[int, List[Any]]:
+        self,
+        name: str,
+        limit: Optional[int] = None,
+        trace: Optional[Trace] = None,
+        budget: Optional[QueryBudget] = None,
+    ) -> SearchResults:
         """Detailed country normalization.
 
         Args:
             name: country name to normalize
             limit: How many results should be searched (None to find all possible results)
+            trace: trace to record durations and candidate counts of the search stages
+                (see :py:mod:`dicountries.tracing`)
+            budget: cost limits of the whoosh search queries (:py:attr:`query_budget` if None)
 
         Raises:
             RuntimeError: if it is called during the reindexation process
@@ -403,52 +1100,239 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
             The result scoring can be bad if the ``limit`` value differ from **None**
 
         """
-        cur_ix = self.get_index()
-        if not cur_ix:
-            raise RuntimeError('Reindexation proccess')
+        return self._search_detailed(self.state, name, limit, trace, budget)
 
-        country = _clean_name(name)
-        query = ''
-        if country:
-            query += f' decoded_country:({country})'
-        query = query.strip()
-        # logger.debug(f'query: {query}')
-        if not query:
+    def _search_detailed(
+        self,
+        state: IndexState,
+        name: str,
+        limit: Optional[int] = None,
+        trace: Optional[Trace] = None,
+        budget: Optional[QueryBudget] = None,
+    ) -> SearchResults:
+        """Detailed country normalization using the data snapshot.
+
+        The search is traced if the ``trace`` is passed or the :py:attr:`tracer` is set.
+
+        Args:
+            state: data snapshot
+            name: country name to normalize
+            limit: How many results should be searched (None to find all possible results)
+            trace: trace to mark the search stages
+            budget: cost limits of the whoosh search queries (:py:attr:`query_budget` if None)
+
+        Raises:
+            RuntimeError: if it is called during the reindexation process
+
+        Returns:
+            All possible variants from the index for the name and their rates
+            (nothing is found for the names rejected by the :py:attr:`IndexState.prefilter`).
+
+        """
+        if state.prefilter is not None and not state.prefilter.accepts(name):
             return 0, []
+        tracer = self.tracer
+        if trace is None and tracer is not None:
+            trace = Trace(name)
+        if state.fuzzy_ix:
+            results = state.fuzzy_ix.search(name, limit, self.scorer, trace)
+        else:
+            cur_ix = state.ix
+            if not cur_ix:
+                raise RuntimeError('Reindexation proccess')
+            with cur_ix.searcher() as s:
+                parsers = self._create_query_parsers()
+                if trace is not None:
+                    trace.mark('open_searcher')
+                budget = self.query_budget if budget is None else budget
+                results = self._search(
+                    s, parsers, name, limit, self.scorer, self.metrics, trace, budget
+                )
+        if trace is not None and tracer is not None:
+            tracer(trace)
+        return results
+
+    def _search_names(
+        self, state: IndexState, names: List[str]
+    ) -> Iterator[Tuple[str, SearchResults]]:
+        """Search several names opening the whoosh searcher only once.
+
+        Every search is traced if the :py:attr:`tracer` is set.
 
+        Args:
+            state: data snapshot
+            names: country names to search
+
+        Raises:
+            RuntimeError: if it is called during the reindexation process
+
+        Yields:
+            names and their search results
+
+        """
+        tracer = self.tracer
+        fuzzy_ix = state.fuzzy_ix
+        if fuzzy_ix:
+            for name in names:
+                trace = Trace(name) if tracer is not None else None
+                yield name, fuzzy_ix.search(name, None, self.scorer, trace)
+                if trace is not None and tracer is not None:
+                    tracer(trace)
+            return
+
+        cur_ix = state.ix
+        if not cur_ix:
+            raise RuntimeError('Reindexation proccess')
+        parsers = self._create_query_parsers()
         with cur_ix.searcher() as s:
-            qp = QueryParser('decoded_country', schema=self.schema, termclass=self.CountryTermClass)
-            q = qp.parse(query)
-            results = s.search(q, limit=None)
-            if not results:
-                qp = QueryParser(
-                    'decoded_country',
-                    schema=self.schema,
-                    termclass=self.CountryTermClass,
-                    group=OrGroup,
-                )
-                q = qp.parse(query)
-                results = s.search(q, limit=None)
-            results = [
-                dict(
-                    basecountry=hit['basecountry'],
-                    country=hit['country'],
-                    # rate=hit.score,
-                    rate=fuzz.token_sort_ratio(
-                        _clean_name2(name), _clean_name2(hit['country'])
-                    ),  # rate=hit.score
+            for name in names:
+                trace = Trace(name) if tracer is not None else None
+                results = self._search(
+                    s, parsers, name, None, self.scorer, self.metrics, trace, self.query_budget
                 )
-                for hit in results
-            ]
-            results = sorted(results, key=lambda k: k['rate'], reverse=True)
-            results_len = len(results)
-            try:
-                limit = int(cast(int, limit))
-            except (ValueError, TypeError):
-                limit = None
-            if limit:
-                results = results[:limit]
-            return results_len, results
+                yield name, results
+                if trace is not None and tracer is not None:
+                    tracer(trace)
+
+    @staticmethod
+    def _find_simple_name(state: IndexState, name: str) -> Tuple[Optional[str], str]:
+        """Find stripped name in the direct index, the country code index
+        and then in the folded direct index.
+
+        The codes are looked up after the exact names, so the synonyms take precedence
+        over the codes, and before the capitalized names and the folded index,
+        so **NGA** is not taken for a differently capitalized name.
+
+        Args:
+            state: data snapshot
+            name: name to find
+
+        Returns:
+            normalized country name (not postprocessed) or None if the name is not found
+            and the resolution path (see :py:data:`dicountries.metrics.PATHS`)
+
+        """
+        simple_index = state.simple_index
+        if simple_index and name in simple_index:
+            return simple_index[name], EXACT
+        if state.code_index:
+            code = state.code_index.get(name)
+            if code is not None:
+                return code, CODE
+        if simple_index and name.capitalize() in simple_index:
+            return simple_index[name.capitalize()], EXACT
+        if state.folded_index:
+            folded = state.folded_index.get(fold_name(name))
+            if folded is not None:
+                return folded, FOLDED
+        return None, MISS
+
+    def _find_simple_names(
+        self, state: IndexState, names: Iterable[str]
+    ) -> Tuple[Dict[str, str], List[str]]:
+        """Find stripped names in the direct index, the country code index
+        and then in the folded direct index (see :py:meth:`_find_simple_name`).
+
+        Args:
+            state: data snapshot
+            names: names to find
+
+        Returns:
+            normalized country names (not postprocessed) by found names
+            and unique names that were not found
+
+        """
+        found: Dict[str, str] = {}
+        misses: List[str] = []
+        code_count = folded_count = 0
+        simple_index = state.simple_index or {}
+        code_index = state.code_index or {}
+        folded_index = state.folded_index or {}
+        for name in dict.fromkeys(names):
+            if name in simple_index:
+                found[name] = simple_index[name]
+            elif name in code_index:
+                found[name] = code_index[name]
+                code_count += 1
+            elif name.capitalize() in simple_index:
+                found[name] = simple_index[name.capitalize()]
+            else:
+                folded = folded_index.get(fold_name(name))
+                if folded is None:
+                    misses.append(name)
+                else:
+                    found[name] = folded
+                    folded_count += 1
+        if self.metrics is not None:
+            self.metrics.inc(EXACT, len(found) - code_count - folded_count)
+            self.metrics.inc(CODE, code_count)
+            self.metrics.inc(FOLDED, folded_count)
+        return found, misses
+
+    def _search_base_name(self, state: IndexState, name: str) -> Tuple[str, str]:
+        """Normalize stripped name using the search cache and fuzzy search.
+
+        Args:
+            state: data snapshot
+            name: name to normalize
+
+        Returns:
+            normalized country name (not postprocessed)
+            and the resolution path (see :py:data:`dicountries.metrics.PATHS`)
+
+        """
+        if state.prefilter is not None and not state.prefilter.accepts(name):
+            return name, REJECTED
+        logger.info('! Use whoosh index for %s', name)
+        result = state.search_cache.get(name)
+        if result is not None:
+            return result, CACHE
+        results = self._search_detailed(state, name)
+        result = self._get_base_name(name, results)
+        state.search_cache.put(name, result)
+        return result, SEARCH if results[0] else MISS
+
+    def _search_base_names(self, state: IndexState, names: List[str]) -> List[str]:
+        """Normalize unique stripped names using the search cache and fuzzy search.
+
+        Args:
+            state: data snapshot
+            names: names to normalize
+
+        Returns:
+            normalized country names (not postprocessed) in the order of ``names``
+
+        """
+        resolved: Dict[str, str] = {}
+        pending: List[str] = []
+        rejected_count = 0
+        prefilter = state.prefilter
+        for name in names:
+            if prefilter is not None and not prefilter.accepts(name):
+                resolved[name] = name
+                rejected_count += 1
+                continue
+            cached = state.search_cache.get(name)
+            if cached is None:
+                pending.append(name)
+            else:
+                resolved[name] = cached
+
+        found_count = 0
+        if pending:
+            logger.info('! Use whoosh index for %d names', len(pending))
+            for name, results in self._search_names(state, pending):
+                result = self._get_base_name(name, results)
+                state.search_cache.put(name, result)
+                resolved[name] = result
+                found_count += bool(results[0])
+
+        if self.metrics is not None:
+            self.metrics.inc(REJECTED, rejected_count)
+            self.metrics.inc(CACHE, len(names) - len(pending) - rejected_count)
+            self.metrics.inc(SEARCH, found_count)
+            self.metrics.inc(MISS, len(pending) - found_count)
+        return [resolved[name] for name in names]
 
     def normalize_country(self, name: str, postprocess: bool = True) -> str:
         """Country name normalization.
@@ -466,29 +1350,162 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
             normalized and possibly postprocessed country name
 
         """
+        start = time.perf_counter() if self.metrics is not None else 0.0
         name = name.strip()
-        with self.simple_index_lock:
-            if self.simple_index:
-                if name in self.simple_index:
-                    return self.post_process_name(self.simple_index[name], postprocess)
-                if name.capitalize() in self.simple_index:
-                    return self.post_process_name(self.simple_index[name.capitalize()], postprocess)
-        logger.info('! Use whoosh index for %s', name)
-        result: str
-        if name in self.search_cache:
-            result = self.search_cache[name]
-        else:
-            results = self.normalize_country_detailed(name)
-            if not results[0]:
-                logger.info('! missed %s', name)
-                result = self.post_process_name(name, postprocess)
+        state = self.state
+        result, path = self._find_simple_name(state, name)
+        if result is None:
+            result, path = self._search_base_name(state, name)
+        if self.metrics is not None:
+            self.metrics.observe(path, time.perf_counter() - start)
+        return self.post_process_name(result, postprocess)
+
+    def find_country(self, name: str, postprocess: bool = True) -> Optional[str]:
+        """Find country name without fuzzy search.
+
+        The name is looked up only in the direct index, the country code index and
+        the folded direct index like :py:meth:`normalize_country` does before fuzzy search.
+
+        Args:
+            name: name to find
+            postprocess: flag showing if postprocessing should be applied
+
+        Returns:
+            normalized and possibly postprocessed country name or None if the name is not found
+
+        """
+        result, _ = self._find_simple_name(self.state, name.strip())
+        if result is None:
+            return None
+        return self.post_process_name(result, postprocess)
+
+    def normalize_countries(self, names: Iterable[str], postprocess: bool = True) -> List[str]:
+        """Batch country name normalization.
+
+        Works like :py:meth:`normalize_country` applied to every name, but equal names are
+        searched only once and one whoosh searcher is opened for all names requiring
+        fuzzy search.
+
+        Args:
+            names: names to normalize
+            postprocess: flag showing if postprocessing should be applied
+
+        Raises:
+            RuntimeError: if fuzzy search is required during the reindexation process
+
+        Returns:
+            normalized and possibly postprocessed country names in the order of ``names``
+
+        """
+        names = [name.strip() for name in names]
+        state = self.state
+        resolved, misses = self._find_simple_names(state, names)
+        resolved.update(zip(misses, self._search_base_names(state, misses)))
+        return [self.post_process_name(resolved[name], postprocess) for name in names]
+
+    def _search_base_names_async(
+        self, state: IndexState, names: List[str]
+    ) -> List['asyncio.Future[str]']:
+        """Start fuzzy search of unique stripped names in the executor.
+
+        Names already searched for the running event loop are not searched again,
+        the futures of the running searches are returned for them.
+
+        Args:
+            state: data snapshot
+            names: names to normalize
+
+        Returns:
+            futures of the normalized country names (not postprocessed) in the order of ``names``
+
+        """
+        loop = asyncio.get_event_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        new_names: List[str] = []
+        for name in names:
+            future = self._pending_searches.get((loop, name))
+            if future is None:
+                new_names.append(name)
             else:
-                result = results[1][0].get('basecountry')
-                result = self.post_process_name(result or name, postprocess)
-            if len(self.search_cache) > self.max_search_cache:
-                self.search_cache = {}  # Reinit cache to protect memory (atacks?)
-            self.search_cache[name] = result
-        return result
+                futures[name] = future
+        if new_names:
+            for name in new_names:
+                futures[name] = self._pending_searches[loop, name] = loop.create_future()
+            batch = loop.run_in_executor(
+                self.get_executor(), self._search_base_names, state, new_names
+            )
+            batch.add_done_callback(partial(self._resolve_pending_searches, loop, new_names))
+        return [futures[name] for name in names]
+
+    def _resolve_pending_searches(
+        self, loop: asyncio.AbstractEventLoop, names: List[str], batch: asyncio.Future
+    ) -> None:
+        """Set results of the futures created by :py:meth:`_search_base_names_async`.
+
+        Args:
+            loop: event loop
+            names: searched names
+            batch: finished future of the batch search
+
+        """
+        for i, name in enumerate(names):
+            future = self._pending_searches.pop((loop, name))
+            if future.done():
+                continue
+            if batch.cancelled():
+                future.cancel()
+            elif batch.exception() is not None:
+                future.set_exception(cast(BaseException, batch.exception()))
+            else:
+                future.set_result(batch.result()[i])
+
+    async def normalize_country_async(self, name: str, postprocess: bool = True) -> str:
+        """Country name normalization. Asynchronous version.
+
+        Works like :py:meth:`normalize_country`, but fuzzy search is done in the
+        :py:attr:`executor`. Concurrent requests for the same name share a single search.
+
+        Args:
+            name: name to normalize
+            postprocess: flag showing if postprocessing should be applied
+
+        Returns:
+            normalized and possibly postprocessed country name
+
+        """
+        name = name.strip()
+        state = self.state
+        result, path = self._find_simple_name(state, name)
+        if result is not None and self.metrics is not None:
+            self.metrics.inc(path)
+        if result is None:
+            result = await asyncio.shield(self._search_base_names_async(state, [name])[0])
+        return self.post_process_name(result, postprocess)
+
+    async def normalize_countries_async(
+        self, names: Iterable[str], postprocess: bool = True
+    ) -> List[str]:
+        """Batch country name normalization. Asynchronous version.
+
+        Works like :py:meth:`normalize_countries`, but fuzzy search is done in the
+        :py:attr:`executor`. Concurrent requests for the same names share a single search.
+
+        Args:
+            names: names to normalize
+            postprocess: flag showing if postprocessing should be applied
+
+        Returns:
+            normalized and possibly postprocessed country names in the order of ``names``
+
+        """
+        names = [name.strip() for name in names]
+        state = self.state
+        resolved, misses = self._find_simple_names(state, names)
+        if misses:
+            futures = self._search_base_names_async(state, misses)
+            results = await asyncio.shield(asyncio.gather(*futures))
+            resolved.update(zip(misses, results))
+        return [self.post_process_name(resolved[name], postprocess) for name in names]
 
     def refine_country(self, name: str) -> str:
         """Country name normalization and refining.
@@ -512,7 +1529,34 @@ class CountryIndex:  # pylint: disable=too-many-instance-attributes
             Normalized and possibly refined country name
 
         """
-        name = self.normalize_country(name, postprocess=False)
-        if name in self.post_process_country_map:
-            return self.post_process_country_map[name]
+        return self.refine_name(self.normalize_country(name, postprocess=False))
+
+    def refine_countries(self, names: Iterable[str]) -> List[str]:
+        """Batch country name normalization and refining.
+
+        Works like :py:meth:`refine_country` applied to every name, but uses
+        :py:meth:`normalize_countries` to normalize the names.
+
+        Args:
+            names: Country names to normalize and refine
+
+        Returns:
+            Normalized and possibly refined country names in the order of ``names``
+
+        """
+        return [self.refine_name(name) for name in self.normalize_countries(names, False)]
+
+    def refine_name(self, name: str) -> str:
+        """Refine normalized country name (see :py:meth:`refine_country`).
+
+        Args:
+            name: normalized country name (not postprocessed)
+
+        Returns:
+            refined country name
+
+        """
+        post_process_country_map = self.state.post_process_country_map
+        if name in post_process_country_map:
+            return post_process_country_map[name]
         return reorder_name(name)
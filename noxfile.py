@@ -141,3 +141,12 @@ def vale(session, dilibraries=dilibraries):
     """Check code with vale."""
     session.log(f'Run vale for {lib_name}')
     standard_di_vale(session, dilibraries=dilibraries)
+
+
+@nox.session(python=main_python, reuse_venv=True)
+@nox.parametrize('extras', [None])
+def benchmark(session, extras, dilibraries=dilibraries):
+    """Run normalization benchmarks."""
+    session.log(f'Run benchmark for {lib_name}')
+    common_setup(session, extras=extras, dilibraries=dilibraries)
+    session.run('python', 'benchmarks/bench_normalize.py', *session.posargs)
@@ -5,7 +5,7 @@ from pathlib import Path
 from dicountries import metadata
 from setuptools import find_packages, setup
 
-BUNDLES = {}
+BUNDLES = {'pandas', 'rapidfuzz'}
 
 
 def strip_comments(l):
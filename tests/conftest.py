@@ -0,0 +1,15 @@
+"""Common test fixtures."""
+# pylint: skip-file
+
+import logging
+
+import pytest
+
+from dicountries.whoosh_index import CountryIndex
+
+
+@pytest.fixture(scope='session')
+def country_index(tmp_path_factory):
+    """Country index built once for the test session."""
+    logging.getLogger('dicountries').setLevel(logging.ERROR)
+    return CountryIndex(index_path=str(tmp_path_factory.mktemp('indexes') / 'countries'))
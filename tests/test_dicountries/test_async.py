@@ -0,0 +1,46 @@
+"""Asynchronous API tests."""
+# pylint: skip-file
+
+import asyncio
+
+from dicountries.whoosh_index import CountryIndex
+
+
+def test_async_normalization(country_index):
+    """Concurrent requests for the same name share a single search."""
+    searched = []
+    search_base_names = country_index._search_base_names
+
+    def counting_search(state, names):
+        searched.extend(names)
+        return search_base_names(state, names)
+
+    async def normalize():
+        return await asyncio.gather(
+            country_index.normalize_country_async('Frnace'),
+            country_index.normalize_country_async(' Frnace'),
+            country_index.normalize_countries_async(['Russia', 'Frnace', 'Gremany']),
+        )
+
+    country_index.search_cache.clear()
+    country_index._search_base_names = counting_search
+    try:
+        results = asyncio.run(normalize())
+    finally:
+        del country_index._search_base_names
+    assert results == ['France', 'France', ['Russian Federation', 'France', 'Germany']]
+    assert sorted(searched) == ['Frnace', 'Gremany']
+
+
+def test_async_init(country_index):
+    """Index restoring can be awaited."""
+
+    async def create():
+        index = CountryIndex(index_path=country_index.path, use_async=True)
+        await index.wait_ready()
+        await index.refresh_async()
+        index.close()
+        return index
+
+    index = asyncio.run(create())
+    assert index.normalize_country('Rusia') == 'Russian Federation'
@@ -0,0 +1,107 @@
+"""Crash safe backup tests."""
+# pylint: skip-file
+
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from dicountries.backup import (
+    BACKUP_VER,
+    LOCK_NAME,
+    MANIFEST_NAME,
+    TMP_PREFIX,
+    get_backup_dir,
+    load_manifest,
+    write_backup,
+)
+
+
+def test_write_backup(tmp_path):
+    """Every backup is a new generation published by the manifest."""
+    path = str(tmp_path / 'backup')
+    first = write_backup(path, {'a.seg': b'a', 'MAIN.toc': b'toc1'})
+    assert get_backup_dir(path) == first
+    assert set(load_manifest(path)['files']) == {'a.seg', 'MAIN.toc'}
+
+    second = write_backup(path, {'a.seg': b'a', 'b.seg': b'b', 'MAIN.toc': b'toc2'})
+    assert get_backup_dir(path) == second
+    assert not os.path.exists(first)
+    assert sorted(os.listdir(second)) == ['MAIN.toc', 'a.seg', 'b.seg']
+    with open(os.path.join(second, 'MAIN.toc'), 'rb') as f:
+        assert f.read() == b'toc2'
+
+
+def test_interrupted_backup(tmp_path):
+    """A torn temporary directory is ignored and a broken generation is not restored."""
+    path = str(tmp_path / 'backup')
+    generation = write_backup(path, {'a.seg': b'a', 'MAIN.toc': b'toc'})
+    os.makedirs(os.path.join(path, f'{TMP_PREFIX}torn'))
+    assert get_backup_dir(path) == generation
+    assert write_backup(path, {'a.seg': b'b'}) == get_backup_dir(path) != generation
+    assert not os.path.exists(os.path.join(path, f'{TMP_PREFIX}torn'))
+
+    with open(os.path.join(get_backup_dir(path), 'a.seg'), 'wb') as f:
+        f.write(b'c')
+    assert get_backup_dir(path) is None
+
+    with open(os.path.join(path, MANIFEST_NAME), 'wt') as f:
+        f.write('{')
+    assert get_backup_dir(path) is None
+
+
+@pytest.mark.parametrize(
+    'manifest',
+    [
+        dict(files={}),
+        dict(generation='gen-000001'),
+        dict(generation=1, files={}),
+        dict(generation='gen-000001', files=[]),
+        dict(generation='gen-000001', files={'a.seg': 1}),
+        dict(generation='../gen-000001', files={}),
+    ],
+)
+def test_malformed_manifest(tmp_path, manifest):
+    """A manifest of the current version with a wrong structure is a broken backup."""
+    path = str(tmp_path / 'backup')
+    write_backup(path, {'a.seg': b'a'})
+    with open(os.path.join(path, MANIFEST_NAME), 'wt') as f:
+        json.dump(dict(manifest, version=BACKUP_VER), f)
+    assert load_manifest(path) is None
+    assert get_backup_dir(path) is None
+    assert os.path.isdir(write_backup(path, {'a.seg': b'b'}))
+
+
+def test_size_only_check(tmp_path):
+    """Attaching checks only the file sizes, the full check compares the hashes."""
+    path = str(tmp_path / 'backup')
+    generation = write_backup(path, {'a.seg': b'a', 'MAIN.toc': b'toc'})
+    with open(os.path.join(generation, 'a.seg'), 'wb') as f:
+        f.write(b'b')
+    assert get_backup_dir(path, verify_hashes=False) == generation
+    assert get_backup_dir(path) is None
+
+    with open(os.path.join(generation, 'a.seg'), 'wb') as f:
+        f.write(b'')
+    assert get_backup_dir(path, verify_hashes=False) is None
+
+
+def _write_backups(path, number):
+    for i in range(5):
+        write_backup(path, {'a.seg': b'a', f'{number}.seg': b'%d' % i, 'MAIN.toc': b'%d' % i})
+
+
+def test_concurrent_backups(tmp_path):
+    """Processes sharing the backup directory don't break each other's backups."""
+    path = str(tmp_path / 'backup')
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_write_backups, args=(path, i)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * 4
+    assert get_backup_dir(path) is not None
+    generation = os.path.basename(get_backup_dir(path))
+    assert sorted(os.listdir(path)) == [LOCK_NAME, MANIFEST_NAME, generation]
@@ -0,0 +1,60 @@
+"""Search cache tests."""
+# pylint: skip-file
+
+import time
+
+from dicountries.cache import SearchCache
+from dicountries.whoosh_index import CountryIndex
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted."""
+    cache = SearchCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.get('b') is None
+    assert cache.stats() == dict(
+        hits=3, misses=1, evictions=1, expirations=0, size=2, max_size=2
+    )
+
+
+def test_ttl_expiration():
+    """Expired entries are not returned."""
+    cache = SearchCache(max_size=2, ttl=0.01)
+    cache.put('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert len(cache) == 0
+
+
+def test_cache_copy():
+    """A copy has the same settings and entries except the excluded ones."""
+    cache = SearchCache(max_size=3)
+    for key in 'abc':
+        cache.put(key, key.upper())
+    cache.get('a')
+    copied = cache.copy(exclude={'b'})
+    assert (copied.max_size, copied.ttl) == (3, None)
+    assert copied.keys() == ['c', 'a']
+    assert copied.get('a') == 'A'
+    assert copied.stats()['hits'] == 1
+    assert cache.copy(exclude={'b'}, exclude_if=lambda key: key == 'a').keys() == ['c']
+
+
+def test_cache_respects_postprocess(country_index):
+    """Cached fuzzy results are postprocessed on every read."""
+    country_index = CountryIndex(
+        index_path=country_index.path, post_process_country_map={'France': 'French Republic'}
+    )
+    assert 'Frnace' not in country_index.simple_index
+    assert country_index.normalize_country('Frnace') == 'French Republic'
+    assert country_index.search_cache.stats()['hits'] == 0
+    assert country_index.normalize_country('Frnace', postprocess=False) == 'France'
+    assert country_index.search_cache.stats()['hits'] == 1
+    assert country_index.normalize_country('Frnace') == 'French Republic'
+    assert country_index.search_cache.stats()['hits'] == 2
@@ -1,7 +1,88 @@
 """Some tests."""
 # pylint: skip-file
 
+import pkgutil
+import subprocess
+import sys
+
+import dicountries
+from dicountries.dict_index import fold_index, group_folded_keys, update_folded_index
+from dicountries.utils import fold_name
+
 
 def test_generic():
     """Just a test."""
     assert True == True  # noqa: E712
+
+
+def test_normalize_countries(country_index):
+    """Batch normalization returns the same names as the per name one."""
+    names = ['Russia', 'Rusia', 'Untied Kingdom', 'Russia', '  Gremany ', 'xxxxqq']
+    expected = [country_index.normalize_country(name) for name in names]
+    country_index.search_cache.clear()
+    assert country_index.normalize_countries(names) == expected
+    assert expected[:3] == ['Russian Federation', 'Russian Federation', 'United Kingdom']
+
+
+def test_folded_lookup(country_index):
+    """Case, accent and punctuation variants are found without fuzzy search."""
+    assert fold_name(' Côte d’Ivoire ') == fold_name('COTE D\'IVOIRE') == 'cote d ivoire'
+    assert fold_index({'Ruse': 'Bulgaria', 'RUSE': 'Slovenia', 'Peru': 'Peru'}) == {'peru': 'Peru'}
+    index = {'Ruse': 'Bulgaria', 'RUSE': 'Slovenia', 'Peru': 'Peru'}
+    folded, groups = fold_index(index), group_folded_keys(index)
+    del index['RUSE']
+    index.update({'PERU': 'Chile', 'Chile': 'Chile'})
+    update_folded_index(folded, index, groups, ['RUSE', 'PERU', 'Chile'])
+    assert folded == fold_index(index) == {'ruse': 'Bulgaria', 'chile': 'Chile'}
+    assert groups == group_folded_keys(index)
+    names = ['UNITED STATES', 'united kingdom', 'Côte d’Ivoire', 'korea  republic of']
+    found, misses = country_index._find_simple_names(country_index.state, names)
+    assert not misses
+    assert found['UNITED STATES'] == country_index.normalize_country('United States', False)
+    assert [country_index.normalize_country(n, postprocess=False) for n in names] == [
+        found[n] for n in names
+    ]
+    assert country_index.find_country(' UNITED STATES ') == country_index.normalize_country('USA')
+    assert country_index.find_country('Gremany') is None
+
+
+def test_code_lookup(country_index):
+    """ISO codes are found without fuzzy search, the synonyms take precedence over them."""
+    names = ['DE', 'DEU', '276', 'US-CA', 'SUHH', 'NGA', '068', 'ATF']
+    found, misses = country_index._find_simple_names(country_index.state, names)
+    assert not misses
+    assert [country_index.normalize_country(n, postprocess=False) for n in names] == [
+        'Germany',
+        'Germany',
+        'Germany',
+        'United States',
+        'USSR, Union of Soviet Socialist Republics',
+        'Nigeria',
+        'Bolivia, Plurinational State of',
+        'French Southern Territories',
+    ]
+    assert '68' not in country_index.code_index
+    assert country_index.normalize_country('4') == '4'
+    assert [found[n] for n in names] == [country_index.code_index[n] for n in names]
+    assert country_index.normalize_country('DDR') == country_index.normalize_country('Germany')
+
+
+def test_lazy_import():
+    """Importing the package doesn't import whoosh, public names are loaded on access."""
+    code = (
+        'import sys, dicountries; assert "whoosh" not in sys.modules; '
+        'assert dicountries.reorder_name("Korea, Republic of") == "Republic of Korea"; '
+        'assert "whoosh" not in sys.modules; dicountries.CountryIndex'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_package_exports():
+    """Every submodule is registered in the lazy loader and every exported name exists."""
+    modules = {m.name for m in pkgutil.iter_modules(dicountries.__path__) if m.name[0] != '_'}
+    assert modules == dicountries._SUBMODULES
+    for name in dicountries._ATTRIBUTES:
+        assert getattr(dicountries, name) is not None
+    namespace = {}
+    exec('from dicountries import *', namespace)
+    assert set(dicountries.__all__) <= set(namespace)
@@ -0,0 +1,62 @@
+"""Pure python fuzzy index tests."""
+# pylint: skip-file
+
+import pytest
+from fuzzywuzzy import fuzz
+
+from dicountries.fuzzy_index import (
+    FuzzyIndex,
+    analyze,
+    edit_distance,
+    get_deletes,
+    get_max_deletes,
+    get_sort_form,
+)
+from dicountries.utils import clean_sort_name
+from dicountries.whoosh_index import CountryIndex
+
+
+def test_edit_distance():
+    """Transposition is counted as one error."""
+    assert edit_distance('germany', 'germany', 1) == 0
+    assert edit_distance('gremany', 'germany', 1) == 1
+    assert edit_distance('grmany', 'germany', 1) == 1
+    assert edit_distance('gramnay', 'germany', 1) == 2
+
+
+def test_abstract_index():
+    """The base fuzzy index doesn't define how the terms are expanded."""
+    with pytest.raises(TypeError):
+        FuzzyIndex({'Germany': 'Germany'})  # type: ignore
+
+
+def test_sort_form():
+    """Ratio of sort forms is the token sort ratio of the cleaned names."""
+    pairs = [('Korea, Republic of', 'Republic of Korea'), ('CÔTE (d’Ivoire)', 'Cote dIvoire')]
+    for s1, s2 in pairs + [(s2, s1) for s1, s2 in pairs]:
+        expected = fuzz.token_sort_ratio(clean_sort_name(s1), clean_sort_name(s2))
+        assert fuzz.ratio(get_sort_form(s1), get_sort_form(s2)) == expected
+
+
+def test_deletes():
+    """Vocabulary terms have enough deletes to be found by longer searched terms."""
+    assert get_deletes('abc', 1) == {'abc', 'bc', 'ac', 'ab'}
+    assert get_max_deletes('ab') == 0
+    assert get_max_deletes('abcd') == 1
+    assert get_max_deletes('abcdefghi') == 2
+    assert get_max_deletes('abcdefghijklm') == 3
+
+
+def test_analyze():
+    """Names are split to lowercased terms without stop words."""
+    assert analyze('Korea, Republic of') == ['korea', 'republic']
+
+
+@pytest.mark.parametrize('engine', ['ngram', 'symspell'])
+def test_engine_matches_whoosh(engine, country_index, tmp_path):
+    """Pure python engines find the same names as the whoosh engine."""
+    fuzzy_index = CountryIndex(index_path=str(tmp_path / 'countries'), engine=engine)
+    assert fuzzy_index.get_index() is None
+    for name in ['Rusia', 'Untied Kingdom', 'Frnace', 'Korea Repulbic', 'xxxxqq']:
+        expected = country_index.normalize_country_detailed(name, limit=1)
+        assert fuzzy_index.normalize_country_detailed(name, limit=1) == expected
@@ -0,0 +1,116 @@
+"""Command line interface tests."""
+# pylint: skip-file
+
+import io
+import json
+import sys
+
+import pytest
+
+from dicountries.__main__ import main
+
+
+def test_normalize_lines(country_index, tmp_path):
+    """Text input is normalized line by line."""
+    source = tmp_path / 'countries.txt'
+    output = tmp_path / 'result.txt'
+    source.write_text('Russia\nRusia\n\nKorea, Republic of\n', encoding='utf-8')
+    main(['normalize', str(source), '-o', str(output), '--index-path', country_index.path])
+    assert output.read_text(encoding='utf-8').splitlines() == [
+        'Russian Federation',
+        'Russian Federation',
+        '',
+        'Korea, Republic of',
+    ]
+
+
+def test_normalize_csv(country_index, tmp_path):
+    """A csv column is normalized and refined."""
+    source = tmp_path / 'countries.csv'
+    output = tmp_path / 'result.csv'
+    source.write_text('id,country\n1,Rusia\n2,"Korea, Republic of"\n', encoding='utf-8')
+    args = ['normalize', str(source), '-o', str(output), '--index-path', country_index.path]
+    main(args + ['--column', 'country', '--refine', '--chunk-size', '1'])
+    assert output.read_text(encoding='utf-8').splitlines() == [
+        'id,country,country_normalized',
+        '1,Rusia,Russian Federation',
+        '2,"Korea, Republic of",Republic of Korea',
+    ]
+
+
+def test_normalize_detailed(country_index, tmp_path):
+    """Search details are written as json lines."""
+    source = tmp_path / 'countries.txt'
+    output = tmp_path / 'result.jsonl'
+    source.write_text('Rusia\n', encoding='utf-8')
+    args = ['normalize', str(source), '-o', str(output), '--index-path', country_index.path]
+    main(args + ['--detailed', '--limit', '1'])
+    record = json.loads(output.read_text(encoding='utf-8'))
+    assert record['normalized'] == 'Russian Federation'
+    assert record['results'] == [
+        dict(basecountry='Russian Federation', country='Rusia', rate=100)
+    ]
+
+
+def test_normalize_detailed_exact(country_index, tmp_path, monkeypatch):
+    """Fuzzy search is skipped for the names found in the direct index
+    and the other names are searched only once."""
+    source = tmp_path / 'countries.txt'
+    output = tmp_path / 'result.jsonl'
+    source.write_text(' Russia \nRusssia\n', encoding='utf-8')
+    searched = []
+    monkeypatch.setattr(
+        'dicountries.whoosh_index.CountryIndex.normalize_country_detailed',
+        lambda self, name, limit=None: searched.append(name) or (0, []),
+    )
+    monkeypatch.setattr('dicountries.whoosh_index.CountryIndex.normalize_countries', None)
+    args = ['normalize', str(source), '-o', str(output), '--index-path', country_index.path]
+    main(args + ['--detailed'])
+    records = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert searched == ['Russsia']
+    assert [record['normalized'] for record in records] == ['Russian Federation', 'Russsia']
+    assert records[0]['results'] == [
+        dict(basecountry='Russian Federation', country='Russia', rate=100)
+    ]
+
+
+def test_normalize_csv_stdin(country_index, tmp_path, monkeypatch):
+    """Quoted line breaks of the csv standard input are kept."""
+    output = tmp_path / 'result.csv'
+    stdin = io.TextIOWrapper(io.BytesIO(b'id,country\r\n1,"Rusia\r\n"\r\n'), encoding='utf-8')
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    main(['normalize', '-o', str(output), '-c', 'country', '--index-path', country_index.path])
+    with open(output, 'rt', encoding='utf-8', newline='') as f:
+        assert f.read() == 'id,country,country_normalized\n1,"Rusia\r\n",Russian Federation\n'
+    assert not stdin.closed
+
+
+def test_normalize_lines_stdin_encoding(country_index, tmp_path, monkeypatch):
+    """Text standard input is decoded with the --encoding value."""
+    output = tmp_path / 'result.txt'
+    stdin = io.TextIOWrapper(io.BytesIO('Côte d’Ivoire\n'.encode('utf-16')), encoding='ascii')
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    args = ['normalize', '-o', str(output), '--encoding', 'utf-16', '--no-postprocess']
+    main(args + ['--index-path', country_index.path])
+    assert output.read_text(encoding='utf-16').splitlines() == [
+        country_index.normalize_country('Côte d’Ivoire', postprocess=False)
+    ]
+
+
+@pytest.mark.parametrize(
+    'args',
+    [
+        ['--engine', 'foo'],
+        ['missing.txt'],
+        ['--chunk-size', '0'],
+        ['--chunk-size', '-1'],
+        ['--limit', '-5'],
+        ['--limit', 'x'],
+    ],
+)
+def test_invalid_arguments(args, capsys):
+    """Invalid arguments are reported without a traceback."""
+    with pytest.raises(SystemExit) as exc_info:
+        main(['normalize'] + args)
+    assert exc_info.value.code == 2
+    assert 'error:' in capsys.readouterr().err
@@ -0,0 +1,54 @@
+"""Metrics tests."""
+# pylint: skip-file
+
+import threading
+
+from dicountries.metrics import Histogram, Metrics
+
+
+def test_histogram():
+    """Values are counted in the first bucket with a greater or equal bound."""
+    histogram = Histogram([1, 2])
+    for value in (0.5, 1, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.count == 4 and histogram.sum == 6
+
+
+def test_metrics_threads():
+    """Metrics updated by different threads are summed and kept after the threads finish."""
+    metrics = Metrics()
+    threads = [threading.Thread(target=metrics.observe, args=('search', 0.01)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.inc('search')
+    assert metrics.to_dict()['counters']['search'] == 4
+    assert metrics.to_dict()['latency']['search']['count'] == 3
+    assert len(metrics._shards) == 1  # the shards of the finished threads are merged
+
+
+def test_metrics(country_index, monkeypatch):
+    """Every resolution path is counted by the single and the batch normalization."""
+    metrics = Metrics()
+    monkeypatch.setattr(country_index, 'metrics', metrics)
+    country_index.search_cache.clear()
+    for name in ['Russia', 'RUSSIA!', 'Russsia', 'Russsia', 'xxxxqq']:
+        country_index.normalize_country(name)
+    country_index.normalize_countries(['Russia', 'Russsia', 'Gremany'])
+
+    data = metrics.to_dict()
+    assert data['counters'] == dict(
+        exact=2, code=0, folded=1, rejected=0, cache=2, search=2, miss=1, or_fallback=1, degraded=0
+    )
+    assert data['latency']['cache']['count'] == 1
+    assert data['latency']['exact']['counts'][-1] == 1
+
+    text = metrics.to_prometheus()
+    assert 'dicountries_lookups_total{path="folded"} 1\n' in text
+    assert 'dicountries_lookup_seconds_bucket{path="miss",le="+Inf"} 1\n' in text
+
+    metrics.reset()
+    assert not any(metrics.to_dict()['counters'].values())
@@ -0,0 +1,21 @@
+"""Pandas integration tests."""
+# pylint: skip-file
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+dicountries_pandas = pytest.importorskip('dicountries.pandas')
+
+
+def test_normalize_series(country_index):
+    """Unique values are normalized and broadcast back to the rows, missing values are kept."""
+    series = pd.Series(['Russia', 'Rusia', None, 'Korea, Republic of', 'Russia'], name='country')
+    normalized = series.countries.normalize(country_index)
+    expected = country_index.normalize_countries(['Russia', 'Rusia'])
+    assert list(normalized.iloc[[0, 1, 4]]) == expected + expected[:1]
+    assert pd.isna(normalized.iloc[2])
+    assert normalized.name == 'country'
+    assert normalized.index.equals(series.index)
+
+    refined = dicountries_pandas.normalize_series(series, country_index, refine=True)
+    assert refined.iloc[3] == country_index.refine_country('Korea, Republic of')
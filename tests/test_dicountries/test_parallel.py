@@ -0,0 +1,30 @@
+"""Parallel normalization tests."""
+# pylint: skip-file
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from dicountries.loader import get_raw_data
+from dicountries.parallel import can_fork, normalize_countries
+
+
+def test_parallel_normalization(country_index):
+    """Parallel normalization keeps the order of names."""
+    names = get_raw_data('country_list.txt').decode('utf-8').splitlines()
+    names = [name[1::-1] + name[2:] if i % 3 else name for i, name in enumerate(names)]
+    names += names[:10]
+    expected = country_index.normalize_countries(names)
+    assert normalize_countries(names, country_index, max_workers=2) == expected
+
+
+def test_can_fork(country_index, monkeypatch):
+    """Forking is used only on Linux by a process without other threads."""
+    monkeypatch.setattr('threading.active_count', lambda: 1)
+    monkeypatch.setattr(sys, 'platform', 'linux')
+    monkeypatch.setattr(country_index, 'executor', None)
+    assert can_fork(country_index)
+    monkeypatch.setattr(country_index, 'executor', ThreadPoolExecutor(1))
+    assert not can_fork(country_index)
+    monkeypatch.undo()
+    monkeypatch.setattr(sys, 'platform', 'darwin')
+    assert not can_fork(country_index)
@@ -0,0 +1,52 @@
+"""Prefilter tests."""
+# pylint: skip-file
+
+import pytest
+
+from dicountries.metrics import Metrics
+from dicountries.prefilter import Prefilter
+from dicountries.whoosh_index import CountryIndex
+
+
+@pytest.fixture(scope='module')
+def filtered_index(tmp_path_factory):
+    path = tmp_path_factory.mktemp('indexes') / 'countries'
+    return CountryIndex(index_path=str(path), engine='ngram', prefilter=Prefilter(max_length=50))
+
+
+@pytest.mark.parametrize(
+    'name',
+    ['', 'x', '12345', 'AB-12345678', 'john@example.com', 'https://example.com', 'x' * 51],
+)
+def test_rejects(name):
+    """Hopeless names are rejected without the vocabulary."""
+    assert not Prefilter(max_length=50).accepts(name)
+
+
+def test_vocabulary():
+    """Names without the vocabulary trigrams are rejected by the fitted prefilter."""
+    prefilter = Prefilter().fit(['Russia', 'Germany'])
+    assert prefilter.accepts('Gremany')
+    assert prefilter.accepts('RUSIA')
+    assert not prefilter.accepts('xxxxqq')
+    assert Prefilter().accepts('xxxxqq')
+
+
+def test_country_index(filtered_index):
+    """Rejected names are returned as is and are not searched or cached."""
+    traces = []
+    filtered_index.tracer = traces.append
+    filtered_index.metrics = Metrics()
+    try:
+        assert filtered_index.normalize_country('john@example.com') == 'john@example.com'
+        assert filtered_index.normalize_countries(['xxxxqq', 'Gremany', '12345']) == [
+            'xxxxqq',
+            'Germany',
+            '12345',
+        ]
+        assert filtered_index.normalize_country_detailed('xxxxqq') == (0, [])
+        assert [trace.name for trace in traces] == ['Gremany']
+        assert filtered_index.state.search_cache.get('xxxxqq') is None
+        assert filtered_index.metrics.to_dict()['counters']['rejected'] == 3
+    finally:
+        filtered_index.tracer = filtered_index.metrics = None
@@ -0,0 +1,46 @@
+"""Query budget tests."""
+# pylint: skip-file
+
+from dicountries.metrics import Metrics
+from dicountries.query_budget import QueryBudget
+
+
+def parse(country_index, text):
+    return country_index._create_query_parsers()[0].parse(f'decoded_country:({text})')
+
+
+def test_limit_tokens(country_index):
+    """The longest terms are kept."""
+    query = parse(country_index, 'abcd abcdefgh abcdef')
+    query, limited = QueryBudget(max_tokens=2).limit_query(query)
+    assert limited
+    assert sorted(leaf.text for leaf in query.leaves()) == ['abcdef', 'abcdefgh']
+
+
+def test_limit_edits(country_index):
+    """The largest edit distances are decreased first."""
+    query = parse(country_index, 'internationalization federation')
+    assert [leaf.maxdist for leaf in query.leaves()] == [3, 1]
+    limited_query, limited = QueryBudget(max_edits=2).limit_query(query)
+    assert limited
+    assert [leaf.maxdist for leaf in limited_query.leaves()] == [1, 1]
+    assert [leaf.maxdist for leaf in query.leaves()] == [3, 1]
+    assert QueryBudget().limit_query(query) == (query, False)
+
+
+def test_degraded_search(country_index):
+    """Limited and timed out searches are counted and return the results found so far."""
+    country_index.metrics = Metrics()
+    try:
+        name = 'Untied Kingdom of Great Britan'
+        found, results = country_index.normalize_country_detailed(name)
+        assert results[0]['basecountry'] == 'United Kingdom'
+        assert country_index.metrics.to_dict()['counters']['degraded'] == 0
+
+        garbage = ' '.join(f'{word}xyzqwertyuiop' for word in 'abcdefghijklmnopqrst')
+        assert country_index.normalize_country_detailed(garbage) == (0, [])
+        budget = QueryBudget(deadline=0.0)
+        assert country_index.normalize_country_detailed(name, budget=budget) == (0, [])
+        assert country_index.metrics.to_dict()['counters']['degraded'] == 2
+    finally:
+        country_index.metrics = None
@@ -0,0 +1,137 @@
+"""Index refreshing tests."""
+# pylint: skip-file
+
+import os
+
+import pytest
+
+from dicountries.backup import MappedStorage, get_backup_dir
+from dicountries.dict_index import fold_index
+from dicountries.string_table import StringTable
+from dicountries.whoosh_index import CountryIndex
+
+
+def test_incremental_refresh(tmp_path, monkeypatch):
+    """Only the changed documents of an index copy are updated and the backup has the same files."""
+    path = str(tmp_path / 'countries')
+    country_index = CountryIndex(index_path=path)
+    data = dict(country_index.simple_index)
+    del data['Germany']
+    data['Narnia Kingdom'] = 'Narnia'
+    data['Russia'] = 'Narnia'
+    monkeypatch.setattr(country_index, 'load_super_index', lambda: dict(data))
+    ix = country_index.ix
+
+    country_index.refresh(incremental=True)
+    assert country_index.ix is not ix
+    assert country_index.simple_index == data
+    with country_index.ix.searcher() as searcher:
+        assert searcher.doc_count() == len(data)
+        assert searcher.document(country='Russia')['basecountry'] == 'Narnia'
+        assert searcher.document(country='Germany') is None
+    with ix.searcher() as searcher:  # the published index is not changed
+        assert searcher.document(country='Germany') is not None
+    assert country_index.normalize_country('Narnia Kingdm') == 'Narnia'
+    ix = country_index.ix
+    assert sorted(os.listdir(get_backup_dir(path))) == sorted(ix.storage.list())
+
+    restored_index = CountryIndex(index_path=path)
+    assert restored_index.normalize_country('Narnia Kingdm') == 'Narnia'
+
+    country_index.refresh()
+    assert country_index.ix is not ix
+    assert sorted(os.listdir(get_backup_dir(path))) == sorted(country_index.ix.storage.list())
+    assert CountryIndex(index_path=path).normalize_country('Narnia Kingdm') == 'Narnia'
+
+
+@pytest.mark.parametrize('engine', ['whoosh', 'ngram'])
+def test_synonyms(tmp_path, engine):
+    """Runtime synonyms are indexed, invalidate affected cache entries and are persisted."""
+    path = str(tmp_path / 'countries')
+    country_index = CountryIndex(index_path=path, engine=engine)
+    assert country_index.normalize_country('Narnia Kingdm') != 'Narnia'
+    assert 'Narnia Kingdm' in country_index.search_cache
+    gremany = country_index.normalize_country('Gremany')
+
+    country_index.add_synonyms({'Narnia Kingdom': 'Narnia'}, persist=True)
+    assert 'Gremany' in country_index.search_cache
+    assert 'Narnia Kingdm' not in country_index.search_cache
+    assert country_index.normalize_country('narnia  KINGDOM') == 'Narnia'
+    assert country_index.normalize_country('Narnia Kingdm') == 'Narnia'
+    assert country_index.normalize_country('Gremany') == gremany
+
+    country_index.remove_synonyms(['Germany'])
+    assert 'Germany' not in country_index.simple_index
+    assert country_index.folded_index == fold_index(country_index.simple_index)
+
+    restored_index = CountryIndex(index_path=path, engine=engine)
+    assert restored_index.synonyms == {'Narnia Kingdom': 'Narnia'}
+    assert restored_index.normalize_country('Narnia Kingdm') == 'Narnia'
+    assert 'Germany' in restored_index.simple_index
+    assert [n for n in os.listdir(tmp_path) if n.endswith('.tmp')] == []
+
+    with open(country_index.get_synonyms_path(), 'wt', encoding='utf-8') as f:
+        f.write('{"Narnia Kingdom": "Nar')  # torn write
+    assert CountryIndex(index_path=path, engine=engine).synonyms == {}
+
+
+def test_mmap(tmp_path, monkeypatch):
+    """The index is served from the mapped backup and updates are mapped after the backup."""
+    path = str(tmp_path / 'countries')
+    country_index = CountryIndex(index_path=path, use_mmap=True)
+    assert isinstance(country_index.ix.storage, MappedStorage)
+    assert country_index.ix.storage.folder == get_backup_dir(path)
+    assert country_index.normalize_country('Gremany') == 'Germany'
+
+    restored_index = CountryIndex(index_path=path, use_mmap=True)
+    assert restored_index.ix.storage.folder == get_backup_dir(path)
+
+    data = dict(country_index.simple_index)
+    data['Narnia Kingdom'] = 'Narnia'
+    monkeypatch.setattr(country_index, 'load_super_index', lambda: dict(data))
+    country_index.refresh(incremental=True)
+    assert isinstance(country_index.ix.storage, MappedStorage)
+    assert country_index.ix.storage.folder == get_backup_dir(path)
+    assert country_index.normalize_country('Narnia Kingdm') == 'Narnia'
+    # the old generation is removed but it is still mapped
+    assert restored_index.normalize_country('Gremany') == 'Germany'
+
+    country_index.add_synonyms({'Narnia Republic': 'Narnia'})
+    assert not isinstance(country_index.ix.storage, MappedStorage)
+    assert country_index.normalize_country('Narnia Republik') == 'Narnia'
+
+
+def test_mmap_backup_keeps_cache(tmp_path):
+    """Swapping the index to the mapped backup doesn't drop the cached results."""
+    path = str(tmp_path / 'countries')
+    country_index = CountryIndex(index_path=path, use_mmap=True)
+    country_index.add_synonyms({'Narnia Kingdom': 'Narnia'})
+    assert country_index.normalize_country('Narnia Kingdm') == 'Narnia'
+    country_index.backup_index()
+    assert isinstance(country_index.ix.storage, MappedStorage)
+    assert country_index.search_cache.stats()['size'] > 0
+    hits = country_index.search_cache.stats()['hits']
+    assert country_index.normalize_country('Narnia Kingdm') == 'Narnia'
+    assert country_index.search_cache.stats()['hits'] == hits + 1
+
+
+def test_shared_tables(tmp_path):
+    """Processes with ``use_mmap`` attach to the same direct search tables."""
+    path = str(tmp_path / 'countries')
+    country_index = CountryIndex(index_path=path, use_mmap=True)
+    assert isinstance(country_index.simple_index, StringTable)
+    assert isinstance(country_index.folded_index, StringTable)
+    russia = country_index.simple_index['Russia']
+    assert country_index.normalize_country('RUSSIA!', postprocess=False) == russia
+    assert country_index.folded_index['united kingdom'] == 'United Kingdom'
+
+    mtime = os.stat(country_index.get_table_path()).st_mtime_ns
+    restored_index = CountryIndex(index_path=path, use_mmap=True)
+    assert os.stat(country_index.get_table_path()).st_mtime_ns == mtime
+    assert dict(restored_index.simple_index) == dict(country_index.simple_index)
+
+    country_index.add_synonyms({'Narnia Kingdom': 'Narnia'}, persist=True)
+    assert country_index.normalize_country('Narnia Kingdom') == 'Narnia'
+    restored_index = CountryIndex(index_path=path, use_mmap=True)
+    assert isinstance(restored_index.simple_index, StringTable)
+    assert restored_index.normalize_country('Narnia Kingdom') == 'Narnia'
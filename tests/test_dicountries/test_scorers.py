@@ -0,0 +1,35 @@
+"""Search result scorer tests."""
+# pylint: skip-file
+
+import random
+
+import pytest
+from fuzzywuzzy import fuzz
+
+from dicountries import scorers
+from dicountries.scorers import TokenSortScorer, top_k
+
+
+@pytest.mark.parametrize('use_cdist', [True, False])
+def test_token_sort_scorer(monkeypatch, use_cdist):
+    """Bulk scores are equal to the fuzzywuzzy ratio of every candidate (0 for empty names)."""
+    if not use_cdist:
+        monkeypatch.setattr(scorers, 'cdist', None)
+    candidates = ['korea of republic', 'korea', '', 'of republic korea', 'côte divoire'] * 10
+    for query in ('korea of republic', 'cote d ivoire', ''):
+        expected = [fuzz.ratio(query, c) if query and c else 0 for c in candidates]
+        assert TokenSortScorer().score(query, candidates) == expected
+        assert TokenSortScorer().score(query, candidates[:4]) == expected[:4]
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_top_k(monkeypatch, use_numpy):
+    """Top positions are the same as a stable sort gives."""
+    if not use_numpy:
+        monkeypatch.setattr(scorers, 'np', None)
+    rng = random.Random(0)
+    for size in (0, 5, 300, 1000):
+        scores = [rng.randrange(10) for _ in range(size)]
+        expected = sorted(range(size), key=lambda i: -scores[i])
+        for limit in (None, 1, 7, size // 2, size + 1):
+            assert top_k(scores, limit) == expected[:limit]
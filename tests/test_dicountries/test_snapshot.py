@@ -0,0 +1,29 @@
+"""Super index snapshot tests."""
+# pylint: skip-file
+
+import os
+
+from dicountries.loader import create_basename_by_name_super_index
+from dicountries.snapshot import (
+    load_basename_by_name_super_index,
+    load_super_index_snapshot,
+    save_super_index_snapshot,
+)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """The snapshot is created on the first load and then used."""
+    path = str(tmp_path / 'super_index.snapshot')
+    assert load_super_index_snapshot(path) is None
+    index = load_basename_by_name_super_index(path)
+    assert index == create_basename_by_name_super_index()
+    assert load_super_index_snapshot(path) == index
+    assert os.listdir(tmp_path) == ['super_index.snapshot']
+
+
+def test_outdated_snapshot(tmp_path):
+    """A snapshot with another data hash is ignored."""
+    path = str(tmp_path / 'super_index.snapshot')
+    save_super_index_snapshot({'Rusia': 'Russian Federation'}, path, data_hash='0' * 64)
+    assert load_super_index_snapshot(path) is None
+    assert load_super_index_snapshot(path, data_hash='0' * 64) == {'Rusia': 'Russian Federation'}
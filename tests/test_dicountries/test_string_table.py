@@ -0,0 +1,28 @@
+"""Memory mapped string table tests."""
+# pylint: skip-file
+
+import os
+from array import array
+
+from dicountries.string_table import load_string_tables, save_string_tables
+
+
+def test_save_and_load(tmp_path):
+    """Saved tables are attached as read-only mappings and no temporary file is left."""
+    path = str(tmp_path / 'tables.bin')
+    save_string_tables(path, {'names': {'Russia': 'Russia', 'Frankreich': 'France'}}, 'key')
+    tables = load_string_tables(path, 'key')
+    assert dict(tables['names']) == {'Russia': 'Russia', 'Frankreich': 'France'}
+    assert 'Germany' not in tables['names']
+    assert load_string_tables(path, 'other key') is None
+    assert os.listdir(str(tmp_path)) == ['tables.bin']
+
+
+def test_no_empty_slot(tmp_path):
+    """A lookup in a broken table without empty hash slots stops after probing every slot."""
+    path = str(tmp_path / 'tables.bin')
+    save_string_tables(path, {'names': {'Russia': 'Russia'}}, 'key')
+    table = load_string_tables(path, 'key')['names']
+    table._slots = array('I', [1] * len(table._slots))
+    assert table['Russia'] == 'Russia'
+    assert table.get('Germany') is None
@@ -0,0 +1,47 @@
+"""Search tracing tests."""
+# pylint: skip-file
+
+import pytest
+
+from dicountries.tracing import Trace
+from dicountries.whoosh_index import CountryIndex
+
+
+def test_trace_stages(country_index):
+    """Every whoosh search stage is marked with the candidate counts."""
+    trace = Trace('xxxxqq Federation')
+    found, results = country_index.normalize_country_detailed('xxxxqq Federation', trace=trace)
+    stages = [stage.name for stage in trace.stages]
+    assert stages == [
+        'open_searcher',
+        'clean',
+        'parse',
+        'search',
+        'or_parse',
+        'or_search',
+        'stored_fields',
+        'rerank',
+        'sort',
+    ]
+    counts = {stage.name: stage.count for stage in trace.stages}
+    assert counts['search'] == 0
+    assert counts['or_search'] == counts['stored_fields'] == counts['rerank'] == found
+    assert counts['sort'] == len(results)
+    assert trace.seconds == pytest.approx(sum(s['seconds'] for s in trace.to_dict()['stages']))
+
+
+def test_tracer(tmp_path):
+    """The tracer is called for every fuzzy search."""
+    traces = []
+    country_index = CountryIndex(index_path=str(tmp_path / 'countries'), engine='ngram')
+    country_index.tracer = traces.append
+    country_index.normalize_countries(['Russia', 'Gremany', 'Untied Kingdom'])
+    country_index.normalize_country_detailed('Rusia Federation')
+    assert [trace.name for trace in traces] == ['Gremany', 'Untied Kingdom', 'Rusia Federation']
+    assert [stage.name for stage in traces[0].stages] == [
+        'clean',
+        'search',
+        'stored_fields',
+        'rerank',
+        'sort',
+    ]